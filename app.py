@@ -1,8 +1,26 @@
-from flask import Flask, request, jsonify
-from redemption import KingdomStoryCouponRedemption  # your existing script
+import json
+import os
+import threading
+from flask import Flask, Response, request, jsonify, url_for
+from redemption import BACKENDS, BROWSER_POOL, KingdomStoryCouponRedemption  # your existing script
+from jobs import JobQueue
+from server_registry import ServerRegistry, load_registry
 
 app = Flask(__name__)
 
+
+def run_job(job, on_result):
+    redeemer = KingdomStoryCouponRedemption(job.code, backend=job.backend)
+    redeemer.run_redemption(job.servers, on_result=on_result)
+
+
+# Chrome is memory hungry on Render, so only one redemption runs at a time by default
+job_queue = JobQueue(run_job, max_workers=int(os.getenv("JOB_WORKERS", "1")))
+
+# Launch Chrome in the background at boot so the first job does not pay the cold start
+threading.Thread(target=BROWSER_POOL.warm, name="browser-pool-warm", daemon=True).start()
+
+
 @app.route("/redeem", methods=["POST"])
 def redeem():
     data = request.json
@@ -10,12 +28,61 @@ def redeem():
     if not code:
         return jsonify({"error": "No gift code provided"}), 400
 
-    try:
-        redeemer = KingdomStoryCouponRedemption(code)
-        redeemer.run_redemption()
-        return jsonify({"status": "success", "message": f"Redemption complete for code {code}."})
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+    servers = ServerRegistry.parse_selection(data.get("servers"))
+    unknown = load_registry().unknown(servers or [])
+    if unknown:
+        return jsonify({"error": f"Unknown servers: {', '.join(unknown)}"}), 400
+
+    backend = data.get("backend")
+    if backend is not None and backend not in BACKENDS:
+        return jsonify({"error": f"Unknown backend: {backend} (expected one of {', '.join(BACKENDS)})"}), 400
+
+    job = job_queue.submit(code, servers=servers, backend=backend)
+    return jsonify({
+        "status": "queued",
+        "job_id": job.id,
+        "status_url": url_for("job_status", job_id=job.id),
+        "message": f"Redemption queued for code {code}.",
+    }), 202
+
+
+@app.route("/servers", methods=["GET"])
+def servers():
+    registry = load_registry()
+    return jsonify({
+        key: {"server_name": server["server_name"], "accounts": len(server["ids"])}
+        for key, server in registry.servers.items()
+    })
+
+
+def _stream_job(job):
+    # Server-sent events: one event per redeemed ID, then a final status event
+    seen = 0
+    while True:
+        update = job_queue.wait(job, seen)
+        for result in update["results"]:
+            yield f"event: result\ndata: {json.dumps(result, ensure_ascii=False)}\n\n"
+        seen = update["completed"]
+        if update["status"] in ("done", "failed"):
+            update["results"] = []
+            yield f"event: status\ndata: {json.dumps(update, ensure_ascii=False)}\n\n"
+            return
+        if not update["results"]:
+            yield ": keep-alive\n\n"
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    if request.args.get("stream") or "text/event-stream" in request.headers.get("Accept", ""):
+        return Response(_stream_job(job), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    return jsonify(job_queue.snapshot(job, since=request.args.get("since", 0, type=int)))
+
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=10000)
+    app.run(host="0.0.0.0", port=10000, threaded=True)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Warm pool of WebDriver sessions shared across redemptions.
+
+Starting Chrome dominates short redemption runs, so sessions are launched
+ahead of time, leased with acquire() / release(), health-checked before reuse,
+recycled after a number of uses and evicted after sitting idle.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledSession:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.last_used = time.monotonic()
+
+
+class BrowserPool:
+    def __init__(self, factory, max_size=2, min_size=0, idle_timeout=600, max_uses=50):
+        """
+        `factory()` returns a new WebDriver. At most `max_size` sessions
+        exist at once; idle sessions beyond `min_size` are quit after
+        `idle_timeout` seconds and every session is retired after
+        `max_uses` leases.
+        """
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.min_size = min(min_size, self.max_size)
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self._idle = []
+        self._leased = {}
+        self._launching = 0
+        self._cond = threading.Condition()
+        self._reaper = None
+        self._closed = False
+
+    @property
+    def size(self):
+        return len(self._idle) + len(self._leased) + self._launching
+
+    def warm(self, count=None):
+        """Pre-launch sessions up to `count` (default `min_size`) so the first lease is instant"""
+        count = self.min_size if count is None else min(count, self.max_size)
+        launchers = []
+        with self._cond:
+            while self.size < count:
+                self._launching += 1
+                launchers.append(threading.Thread(target=self._launch_idle, daemon=True))
+        for thread in launchers:
+            thread.start()
+        for thread in launchers:
+            thread.join()
+        self._start_reaper()
+
+    def ensure_capacity(self, size):
+        """Raise `max_size` to at least `size`, e.g. to match the number of parallel redeemers"""
+        with self._cond:
+            if size > self.max_size:
+                self.max_size = size
+                self._cond.notify_all()
+
+    def acquire(self, timeout=None):
+        """Lease a healthy session, launching one if the pool has room, otherwise waiting for a release"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+
+                session = self._idle.pop() if self._idle else None
+                if session is not None:
+                    self._leased[id(session.driver)] = session
+                elif self.size < self.max_size:
+                    self._launching += 1
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a browser session")
+                    self._cond.wait(remaining)
+                    continue
+
+            if session is None:
+                session = self._launch(leased=True)
+            elif not self._healthy(session):
+                with self._cond:
+                    self._leased.pop(id(session.driver), None)
+                self._discard(session)
+                continue
+
+            self._start_reaper()
+            return session.driver
+
+    def release(self, driver, broken=False):
+        """Return a leased session; broken or worn-out sessions are quit instead of reused"""
+        with self._cond:
+            session = self._leased.pop(id(driver), None)
+        if session is None:
+            return
+
+        session.uses += 1
+        session.last_used = time.monotonic()
+        if broken or self._closed or session.uses >= self.max_uses:
+            self._discard(session)
+            return
+
+        try:
+            driver.delete_all_cookies()
+        except Exception:
+            self._discard(session)
+            return
+
+        with self._cond:
+            self._idle.append(session)
+            self._cond.notify()
+
+    def evict_idle(self):
+        """Quit sessions that have been idle longer than `idle_timeout`, keeping `min_size` around"""
+        now = time.monotonic()
+        evicted = []
+        with self._cond:
+            keep = []
+            # _idle is used LIFO, so the stalest sessions sit at the front
+            for session in self._idle:
+                stale = now - session.last_used > self.idle_timeout
+                if stale and self.size - len(evicted) > self.min_size:
+                    evicted.append(session)
+                else:
+                    keep.append(session)
+            self._idle = keep
+        for session in evicted:
+            self._quit(session)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} idle browser session(s)")
+        return len(evicted)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            sessions = self._idle + list(self._leased.values())
+            self._idle = []
+            self._leased = {}
+            self._cond.notify_all()
+        for session in sessions:
+            self._quit(session)
+
+    def _launch(self, leased):
+        # The caller has already reserved a slot in _launching
+        try:
+            session = _PooledSession(self.factory())
+        except Exception:
+            with self._cond:
+                self._launching -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._launching -= 1
+            if leased:
+                self._leased[id(session.driver)] = session
+            else:
+                self._idle.append(session)
+            self._cond.notify()
+        return session
+
+    def _launch_idle(self):
+        try:
+            self._launch(leased=False)
+        except Exception as e:
+            logger.error(f"Could not pre-launch browser session: {e}")
+
+    def _healthy(self, session):
+        try:
+            session.driver.execute_script("return 1")
+            return True
+        except Exception as e:
+            logger.warning(f"Dropping unhealthy browser session: {e}")
+            return False
+
+    def _discard(self, session):
+        self._quit(session)
+        with self._cond:
+            self._cond.notify()
+
+    def _quit(self, session):
+        try:
+            session.driver.quit()
+        except Exception:
+            pass
+
+    def _start_reaper(self):
+        with self._cond:
+            if self._reaper is not None or self.idle_timeout is None:
+                return
+            self._reaper = threading.Thread(target=self._reap, name="browser-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap(self):
+        interval = max(1, min(60, self.idle_timeout / 2))
+        while not self._closed:
+            time.sleep(interval)
+            self.evict_idle()
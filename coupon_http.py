@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Browserless redemption backend for coupon.kingdom-story.com.
+
+Replays the coupon form (server / monarch / serialcode) over a pooled
+requests session instead of driving Chrome, and parses the confirmation
+message out of the response.
+"""
+
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class CouponFormError(Exception):
+    """The coupon page could not be turned into a replayable form"""
+
+
+class _CouponFormParser(HTMLParser):
+    """Collects the redemption form, its hidden fields and the server dropdown entries"""
+
+    def __init__(self):
+        super().__init__()
+        self.action = None
+        self.method = 'post'
+        self.hidden = {}
+        self.servers = {}
+        self._in_form = False
+        self._in_server_list = False
+        self._server_value = None
+        self._server_text = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'form' and self.action is None:
+            self._in_form = True
+            self.action = attrs.get('action') or ''
+            self.method = (attrs.get('method') or 'post').lower()
+        elif tag == 'input' and self._in_form and attrs.get('type') == 'hidden' and attrs.get('name'):
+            self.hidden[attrs['name']] = attrs.get('value') or ''
+        elif tag == 'ul' and attrs.get('data-type') == 'server':
+            self._in_server_list = True
+        elif tag == 'li' and self._in_server_list:
+            self._server_value = attrs.get('data-value') or attrs.get('value')
+            self._server_text = ''
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self._in_form = False
+        elif tag == 'ul' and self._in_server_list:
+            self._in_server_list = False
+        elif tag == 'li' and self._server_text is not None:
+            name = self._server_text.strip()
+            if name:
+                self.servers[name] = self._server_value if self._server_value is not None else name
+            self._server_text = None
+
+    def handle_data(self, data):
+        if self._server_text is not None:
+            self._server_text += data
+
+
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+
+class _MessageParser(HTMLParser):
+    """Reads the text of body > div[2] > div > p, the modal the Selenium flow waits for"""
+
+    def __init__(self):
+        super().__init__()
+        self.stack = []
+        self.child_counts = [{}]
+        self.message = None
+        self._capture = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            return
+        counts = self.child_counts[-1]
+        counts[tag] = counts.get(tag, 0) + 1
+        self.stack.append((tag, counts[tag]))
+        self.child_counts.append({})
+        path = [t if t in ('html', 'body') else f"{t}[{n}]" for t, n in self.stack]
+        if self.message is None and path[-4:] == ['body', 'div[2]', 'div[1]', 'p[1]']:
+            self._capture = ''
+
+    def handle_endtag(self, tag):
+        if not self.stack or tag not in [t for t, _ in self.stack]:
+            return
+        while self.stack:
+            popped, _ = self.stack.pop()
+            self.child_counts.pop()
+            if self._capture is not None and popped == 'p':
+                self.message = self._capture.strip()
+                self._capture = None
+            if popped == tag:
+                break
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            self._capture += data
+
+
+def _response_text(response):
+    # requests assumes ISO-8859-1 for text/html without a charset; the site serves UTF-8
+    if 'charset' not in response.headers.get('Content-Type', '').lower():
+        response.encoding = 'utf-8'
+    return response.text
+
+
+def parse_response_message(response):
+    """Extract the confirmation text from a JSON or HTML form response"""
+    content_type = response.headers.get('Content-Type', '')
+    if 'json' in content_type:
+        payload = response.json()
+        for key in ('message', 'msg', 'result'):
+            if payload.get(key):
+                return str(payload[key]).strip()
+        raise CouponFormError(f"No message in JSON response: {payload}")
+
+    parser = _MessageParser()
+    parser.feed(_response_text(response))
+    if not parser.message:
+        raise CouponFormError("No confirmation message found in response")
+    return parser.message
+
+
+class CouponHttpClient:
+    """Submits the coupon form directly over a pooled, retrying HTTP session"""
+
+    def __init__(self, base_url, timeout=10, pool_size=10):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._form = None
+
+    def load_form(self):
+        """Fetch the coupon page once and cache the form action, hidden fields and server values"""
+        if self._form is not None:
+            return self._form
+
+        response = self.session.get(self.base_url, timeout=self.timeout)
+        response.raise_for_status()
+
+        parser = _CouponFormParser()
+        parser.feed(_response_text(response))
+        if parser.action is None:
+            raise CouponFormError("Coupon form not found on page")
+        if not parser.servers:
+            raise CouponFormError("Server list not found on page")
+
+        self._form = {
+            'action': urljoin(response.url, parser.action),
+            'method': parser.method,
+            'hidden': parser.hidden,
+            'servers': parser.servers,
+        }
+        return self._form
+
+    def redeem(self, server_name, monarch_id, coupon_code):
+        """Submit one redemption and return the site's message"""
+        form = self.load_form()
+        if server_name not in form['servers']:
+            raise CouponFormError(f"Server '{server_name}' is not offered by the coupon page")
+
+        data = dict(form['hidden'])
+        data.update({
+            'server': form['servers'][server_name],
+            'monarch': monarch_id,
+            'serialcode': coupon_code,
+        })
+
+        if form['method'] == 'get':
+            response = self.session.get(form['action'], params=data, timeout=self.timeout)
+        else:
+            response = self.session.post(form['action'], data=data, timeout=self.timeout)
+        response.raise_for_status()
+        return parse_response_message(response)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Redemption flow shared by main.py (CLI / GitHub Actions) and
+redemption.py (the Flask service).
+
+CouponRedemption drives one browser (or HTTP) session through a list of
+(server, monarch_id, code) work items: DOM-driven waits, outcome
+classification, retries with backoff, the optional ledger and per-step
+timings. The entry points only differ in how Chrome is launched, so each
+subclasses it with its own `browser_pool`.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import logging
+import os
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from coupon_http import CouponHttpClient
+from outcomes import ResultType, RetryScheduler, classify
+from server_registry import ServerRegistryError, load_registry
+
+COUPON_URL = os.getenv("COUPON_URL", "https://coupon.kingdom-story.com")
+BACKENDS = ('selenium', 'http')
+MAX_ATTEMPTS = int(os.getenv('MAX_ATTEMPTS', '3'))
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '2'))
+
+SERVER_DROPDOWN = (By.CSS_SELECTOR, "span[class='js-selected-text']")
+MODAL_MESSAGE = (By.XPATH, "/html/body/div[2]/div/p")
+MODAL_CLOSE = (By.XPATH, "/html/body/div[2]/div/button")
+
+# Seconds to wait for each step of the form; override with e.g. WAIT_TIMEOUT_MESSAGE=20
+WAIT_TIMEOUTS = {
+    step: float(os.getenv(f'WAIT_TIMEOUT_{step.upper()}', default))
+    for step, default in (('dropdown', 10), ('option', 5), ('message', 15), ('dismiss', 10))
+}
+POLL_INTERVAL = float(os.getenv('WAIT_POLL_INTERVAL', '0.05'))
+
+
+def _message_changed(previous):
+    """Wait condition: the result modal is visible and shows a non-empty message other than `previous`"""
+    def condition(driver):
+        elements = driver.find_elements(*MODAL_MESSAGE)
+        if not elements or not elements[0].is_displayed():
+            return False
+        text = elements[0].text.strip()
+        return text if text and text != previous else False
+    return condition
+
+
+class CouponRedemption:
+    # BrowserPool the Selenium backend leases sessions from; set by each entry point
+    browser_pool = None
+
+    def __init__(self, coupon_codes, backend=None, ledger=None, timeouts=None):
+        self.logger = logging.getLogger(__name__)
+        # A single code, or a batch submitted back to back for each ID while the server stays selected
+        self.codes = [coupon_codes] if isinstance(coupon_codes, str) else list(coupon_codes)
+        self.NEW_CODE = self.codes[0]
+        self.ledger = ledger
+        self.timeouts = dict(WAIT_TIMEOUTS, **(timeouts or {}))
+        self.timings = {}
+
+        self.backend = backend or os.getenv('REDEEM_BACKEND', 'selenium')
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{self.backend}', expected one of {BACKENDS}")
+
+        self.browser = None
+        self.browser_broken = False
+        self.http = None
+        if self.backend == 'http':
+            self.http = CouponHttpClient(COUPON_URL)
+        else:
+            self.browser = self._start_browser()
+
+    def _start_browser(self):
+        # Lease a warm session instead of launching Chrome per redemption
+        return self.browser_pool.acquire()
+
+    def _wait(self, step, condition):
+        return WebDriverWait(self.browser, self.timeouts[step], poll_frequency=POLL_INTERVAL).until(condition)
+
+    @contextmanager
+    def _timed(self, step):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[step] = round(time.perf_counter() - started, 3)
+
+    def _redeem_coupon(self, server_data, monarch_id, code=None):
+        code = code or self.NEW_CODE
+        self.timings = {}
+        if self.http is not None:
+            return self._redeem_coupon_http(server_data, monarch_id, code)
+
+        try:
+            # Batches submit several codes per ID in a row: keep the server and ID that are already filled in
+            if self._selected_server() != server_data['server_name']:
+                with self._timed('dropdown'):
+                    # Enabled again once the previous modal is gone
+                    select_server = self._wait('dropdown', EC.element_to_be_clickable(SERVER_DROPDOWN))
+                    select_server.click()
+
+                with self._timed('select_server'):
+                    server_xpath = f"//ul[@data-type='server']/li[text()='{server_data['server_name']}']"
+                    self._wait('option', EC.element_to_be_clickable((By.XPATH, server_xpath))).click()
+
+            with self._timed('fill_form'):
+                input_id = self.browser.find_element(By.NAME, "monarch")
+                if input_id.get_attribute("value") != monarch_id:
+                    input_id.clear()
+                    input_id.send_keys(monarch_id)
+
+                input_code = self.browser.find_element(By.NAME, "serialcode")
+                input_code.clear()
+                input_code.send_keys(code)
+
+            previous = self._modal_text()
+            with self._timed('submit'):
+                self.browser.find_element(By.XPATH, "/html/body/main/form/button").click()
+                message = self._wait('message', _message_changed(previous))
+
+            self.logger.info(f"{monarch_id}: {message} - {code}")
+
+            with self._timed('dismiss'):
+                self.browser.find_element(*MODAL_CLOSE).click()
+                self._wait('dismiss', EC.invisibility_of_element_located(MODAL_MESSAGE))
+            return message, classify(message)
+
+        except Exception as e:
+            result_type = classify(error=e)
+            self.logger.error(f"Error redeeming for {monarch_id} ({result_type}): {e}")
+            return None, result_type
+
+    def _selected_server(self):
+        elements = self.browser.find_elements(*SERVER_DROPDOWN)
+        return elements[0].text.strip() if elements else None
+
+    def _modal_text(self):
+        # Hidden elements report empty text, so this is '' unless a modal is still showing
+        elements = self.browser.find_elements(*MODAL_MESSAGE)
+        return elements[0].text.strip() if elements else ''
+
+    def _redeem_coupon_http(self, server_data, monarch_id, code):
+        try:
+            with self._timed('submit'):
+                message = self.http.redeem(server_data['server_name'], monarch_id, code)
+            self.logger.info(f"{monarch_id}: {message} - {code}")
+            return message, classify(message)
+
+        except Exception as e:
+            result_type = classify(error=e)
+            self.logger.error(f"Error redeeming for {monarch_id} ({result_type}): {e}")
+            return None, result_type
+
+    def _recover_session(self):
+        # A transient Selenium failure can leave the modal open or the page half loaded
+        if self.browser is not None:
+            try:
+                self.browser.get(COUPON_URL)
+            except Exception as e:
+                self.logger.warning(f"Could not reload coupon page: {e}")
+
+    def _open_session(self):
+        """Prepare the active backend, falling back to Selenium if the HTTP form cannot be replayed"""
+        if self.http is not None:
+            try:
+                self.http.load_form()
+                return
+            except Exception as e:
+                self.logger.warning(f"HTTP backend unavailable ({e}), falling back to Selenium")
+                self.http.close()
+                self.http = None
+                self.browser = self._start_browser()
+
+        self.browser.get(COUPON_URL)
+
+    def _open_session_with_retry(self):
+        """Open the session, retrying transient page-load failures with the same backoff as submissions"""
+        backoff = RetryScheduler(max_attempts=MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY)
+        attempt = 1
+        while True:
+            try:
+                self._open_session()
+                return
+            except Exception as e:
+                if classify(error=e) != ResultType.TRANSIENT or attempt >= MAX_ATTEMPTS:
+                    raise
+                delay = backoff.backoff(attempt)
+                attempt += 1
+                self.logger.warning(f"Could not open the coupon page ({e}), retrying in {delay:.1f}s "
+                                    f"(attempt {attempt}/{MAX_ATTEMPTS})")
+                time.sleep(delay)
+
+    def _close_session(self):
+        if self.http is not None:
+            self.http.close()
+        if self.browser is not None:
+            # Hand the session back to the pool instead of quitting Chrome
+            self.browser_pool.release(self.browser, broken=self.browser_broken)
+            self.browser = None
+
+    @staticmethod
+    def registry():
+        """The server registry (servers.json or SERVERS_FILE, see server_registry.py), looked up at call time"""
+        return load_registry()
+
+    @classmethod
+    def build_work_list(cls, codes, servers=None):
+        """
+        Flatten the selected servers into ordered (server, monarch_id, code)
+        work items. Each server is walked once and every code for an ID is
+        queued right after the previous one. Raises ServerRegistryError if
+        `servers` names servers that are not enabled in the registry.
+        """
+        logger = logging.getLogger(__name__)
+        registry = cls.registry()
+        if servers is None:
+            servers = list(registry.servers)
+
+        unknown = registry.unknown(servers)
+        if unknown:
+            raise ServerRegistryError(f"Unknown servers: {', '.join(unknown)}")
+
+        work = []
+        for server in servers:
+            if not registry[server]['ids']:
+                logger.info(f"No IDs configured for {server}. Skipping.")
+                continue
+
+            for monarch_id in registry[server]['ids']:
+                for code in codes:
+                    work.append((server, monarch_id, code))
+
+        return work
+
+    def run_work_list(self, work, on_result=None):
+        """
+        Redeem every (server, monarch_id, code) item in this browser session
+        and return per-ID results, reporting each one to `on_result` as it lands
+        """
+        if self.ledger is not None:
+            pending = self.ledger.pending(work)
+            if len(pending) < len(work):
+                self.logger.info(f"Skipping {len(work) - len(pending)} submissions already settled in the ledger")
+            work = pending
+
+        # Transient failures go back into the queue with backoff while the rest of the list carries on
+        scheduler = RetryScheduler(max_attempts=MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY)
+        for index, item in enumerate(work):
+            scheduler.add((index, item))
+
+        registry = self.registry()
+        results = {}
+        try:
+            self._open_session_with_retry()
+
+            current_server = None
+            while scheduler:
+                (index, (server, monarch_id, code)), attempt = scheduler.next()
+                if server != current_server:
+                    self.logger.info(f"Redeeming on {server} server")
+                    current_server = server
+
+                message, result_type = self._redeem_coupon(registry[server], monarch_id, code)
+                if result_type == ResultType.TRANSIENT and scheduler.retry((index, (server, monarch_id, code)), attempt):
+                    self.logger.warning(f"{monarch_id}: transient failure, retrying (attempt {attempt + 1}/{MAX_ATTEMPTS})")
+                    self._recover_session()
+                    continue
+
+                results[index] = self._settle(server, monarch_id, code, message, result_type, attempt,
+                                              self.timings, on_result)
+
+        except Exception as e:
+            self.logger.error(f"Redemption failed: {e}")
+            self.browser_broken = True
+        finally:
+            self._close_session()
+
+        # Items without an answer (the page never loaded or the session died) are reported as TRANSIENT,
+        # so they show up in the report and stay pending in the ledger
+        unanswered = [index for index in range(len(work)) if index not in results]
+        if unanswered:
+            self.logger.warning(f"{len(unanswered)} submission(s) were never answered; marking them transient")
+        for index in unanswered:
+            server, monarch_id, code = work[index]
+            results[index] = self._settle(server, monarch_id, code, None, ResultType.TRANSIENT, 0, {}, on_result)
+
+        return [results[index] for index in sorted(results)]
+
+    def _settle(self, server, monarch_id, code, message, result_type, attempts, timings, on_result):
+        """Record one final per-ID outcome in the ledger and report it"""
+        if self.ledger is not None:
+            self.ledger.record(code, server, monarch_id, message, result_type, attempts)
+        result = {
+            'server': server,
+            'monarch_id': monarch_id,
+            'code': code,
+            'message': message,
+            'result': result_type,
+            'attempts': attempts,
+            'timings': timings,
+        }
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    def run_redemption(self, servers=None, on_result=None):
+        """Redeem this instance's code(s) on the given servers (default: all enabled ones)"""
+        return self.run_work_list(self.build_work_list(self.codes, servers), on_result=on_result)
+
+    @classmethod
+    def run_parallel(cls, coupon_codes, servers=None, max_workers=4, backend=None, ledger=None):
+        """
+        Shard the servers x ids x codes work list across up to `max_workers`
+        headless browser (or HTTP) sessions and merge the per-ID results back
+        in work-list order. Items already settled in `ledger` are left out
+        before sharding, so no session is started for work that is already done.
+        """
+        logger = logging.getLogger(__name__)
+
+        if isinstance(coupon_codes, str):
+            coupon_codes = [coupon_codes]
+
+        work = cls.build_work_list(coupon_codes, servers)
+        if ledger is not None:
+            pending = ledger.pending(work)
+            if len(pending) < len(work):
+                logger.info(f"Skipping {len(work) - len(pending)} submissions already settled in the ledger")
+            work = pending
+
+        if not work:
+            logger.info("Nothing to redeem.")
+            return []
+
+        workers = max(1, min(max_workers, len({item[:2] for item in work})))
+        shards = _shard(work, workers)
+        if cls.browser_pool is not None:
+            # One session per shard; a smaller pool would make the shards queue on acquire() and run one by one
+            cls.browser_pool.ensure_capacity(workers)
+        logger.info(f"Redeeming {len(work)} submissions ({len(coupon_codes)} code(s)) across {workers} browser session(s)")
+
+        def run_shard(shard):
+            return cls(coupon_codes, backend=backend, ledger=ledger).run_work_list(shard)
+
+        results = []
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="redeemer") as executor:
+            futures = [executor.submit(run_shard, shard) for shard in shards]
+            for shard, future in zip(shards, futures):
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    # The session never started (e.g. Chrome failed to launch); report the shard as failed
+                    logger.error(f"Browser session failed: {e}")
+                    results.extend(
+                        {'server': server, 'monarch_id': monarch_id, 'code': code,
+                         'message': None, 'result': ResultType.TRANSIENT, 'attempts': 0, 'timings': {}}
+                        for server, monarch_id, code in shard
+                    )
+
+        return results
+
+
+def _shard(work, count):
+    """
+    Split the work list into `count` contiguous shards so each session stays
+    on as few servers as possible; all codes for one ID land in the same shard.
+    """
+    groups = []
+    for item in work:
+        if groups and groups[-1][0][:2] == item[:2]:
+            groups[-1].append(item)
+        else:
+            groups.append([item])
+
+    size, extra = divmod(len(groups), count)
+    shards, start = [], 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        shards.append([item for group in groups[start:end] for item in group])
+        start = end
+    return shards
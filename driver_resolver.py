@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+One-time chromedriver resolution.
+
+ChromeDriverManager().install() touches the filesystem and may go to the
+network on every call. The resolved path is instead computed once per
+process and persisted (with the driver and Chrome versions) in a small
+JSON cache, so later processes start offline whenever a matching binary
+is already on disk.
+
+Lookup order: CHROMEDRIVER_PATH, the cache file, a chromedriver already
+installed on the machine (CHROMEWEBDRIVER on GitHub runners, then PATH),
+and only then webdriver-manager.
+"""
+
+from datetime import datetime, timezone
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.getenv(
+    "CHROMEDRIVER_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "tk-utils", "chromedriver.json"),
+)
+CHROME_CANDIDATES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")
+
+_lock = threading.Lock()
+_resolved = {}
+
+
+def _binary_version(binary):
+    """Run `<binary> --version` and return the dotted version, or None"""
+    try:
+        output = subprocess.run(
+            [binary, "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"(\d+)\.(\d+)\.(\d+)\.(\d+)", output)
+    return match.group(0) if match else None
+
+
+def _major(version):
+    return version.split(".", 1)[0] if version else None
+
+
+def _find_chrome(chrome_binary=None):
+    if chrome_binary and os.path.exists(chrome_binary):
+        return chrome_binary
+    for name in CHROME_CANDIDATES:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def _installed_drivers():
+    runner_dir = os.getenv("CHROMEWEBDRIVER")
+    if runner_dir:
+        yield os.path.join(runner_dir, "chromedriver")
+    path = shutil.which("chromedriver")
+    if path:
+        yield path
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _load_cache():
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(record):
+    # Write to a temp file and rename so concurrent processes never read a half-written cache
+    try:
+        directory = os.path.dirname(CACHE_PATH)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".chromedriver-", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError as e:
+        logger.warning(f"Could not write chromedriver cache {CACHE_PATH}: {e}")
+
+
+def _resolve(chrome_binary):
+    explicit = os.getenv("CHROMEDRIVER_PATH")
+    if explicit:
+        return explicit
+
+    chrome = _find_chrome(chrome_binary)
+    chrome_version = _binary_version(chrome) if chrome else None
+
+    cached = _load_cache()
+    if _is_executable(cached.get("path")):
+        # Without a detectable Chrome version the cached binary is the best (offline) answer
+        if chrome_version is None or _major(cached.get("chrome_version")) == _major(chrome_version):
+            logger.info(f"Using cached chromedriver {cached.get('driver_version')} at {cached['path']}")
+            return cached["path"]
+
+    source = None
+    for candidate in _installed_drivers():
+        if _is_executable(candidate):
+            driver_version = _binary_version(candidate)
+            if chrome_version is None or _major(driver_version) == _major(chrome_version):
+                path, source = candidate, "installed"
+                break
+    else:
+        from webdriver_manager.chrome import ChromeDriverManager
+        path, source = ChromeDriverManager().install(), "webdriver-manager"
+        driver_version = _binary_version(path)
+
+    logger.info(f"Resolved chromedriver {driver_version} for Chrome {chrome_version} via {source}: {path}")
+    _save_cache({
+        "path": path,
+        "driver_version": driver_version,
+        "chrome_version": chrome_version,
+        "source": source,
+        "resolved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    })
+    return path
+
+
+def resolve_chromedriver(chrome_binary=None):
+    """Return the chromedriver path for `chrome_binary`, resolving it at most once per process"""
+    with _lock:
+        if chrome_binary not in _resolved:
+            _resolved[chrome_binary] = _resolve(chrome_binary)
+        return _resolved[chrome_binary]
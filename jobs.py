@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+In-process job queue for the Flask redemption service.
+
+Jobs run on a small background thread pool so /redeem can return
+immediately; each job keeps its per-ID results so /jobs/<id> can report
+(or stream) progress while the redemption is still running.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import logging
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+class Job:
+    def __init__(self, code, servers=None, backend=None):
+        self.id = uuid.uuid4().hex
+        self.code = code
+        self.servers = servers
+        self.backend = backend
+        self.status = 'queued'
+        self.results = []
+        self.error = None
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def to_dict(self, since=0):
+        return {
+            'id': self.id,
+            'code': self.code,
+            'servers': self.servers,
+            'backend': self.backend,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'completed': len(self.results),
+            'results': self.results[since:],
+        }
+
+
+class JobQueue:
+    def __init__(self, runner, max_workers=1, max_finished=100):
+        """
+        `runner(job, on_result)` performs the work for one job and calls
+        `on_result(result)` for every per-ID outcome.
+        """
+        self.runner = runner
+        self.max_finished = max_finished
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="redeem-job")
+        self.jobs = {}
+        self.changed = threading.Condition()
+
+    def submit(self, code, servers=None, backend=None):
+        job = Job(code, servers=servers, backend=backend)
+        with self.changed:
+            self.jobs[job.id] = job
+            self._prune()
+        self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self.changed:
+            return self.jobs.get(job_id)
+
+    def snapshot(self, job, since=0):
+        with self.changed:
+            return job.to_dict(since)
+
+    def wait(self, job, seen, timeout=15):
+        """Block until `job` has more than `seen` results or finishes; returns a snapshot of what is new"""
+        with self.changed:
+            self.changed.wait_for(lambda: len(job.results) > seen or job.finished, timeout=timeout)
+            return job.to_dict(seen)
+
+    def _update(self, job, **fields):
+        with self.changed:
+            for key, value in fields.items():
+                setattr(job, key, value)
+            self.changed.notify_all()
+
+    def _add_result(self, job, result):
+        with self.changed:
+            job.results.append(result)
+            self.changed.notify_all()
+
+    def _run(self, job):
+        self._update(job, status='running', started_at=_now())
+        try:
+            self.runner(job, lambda result: self._add_result(job, result))
+            self._update(job, status='done', finished_at=_now())
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            self._update(job, status='failed', error=str(e), finished_at=_now())
+
+    def _prune(self):
+        # Keep memory bounded: forget the oldest finished jobs beyond the limit
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Persistent redemption ledger.
+
+Records the outcome of every (coupon code, server, monarch ID) attempt in
+SQLite so repeat runs of the same code only touch IDs that have not
+reached a terminal outcome yet.
+"""
+
+from datetime import datetime, timezone
+import sqlite3
+import threading
+from outcomes import TERMINAL
+
+TERMINAL_STATUSES = tuple(sorted(TERMINAL))
+
+
+class RedemptionLedger:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS redemptions (
+                    code TEXT NOT NULL,
+                    server TEXT NOT NULL,
+                    monarch_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    message TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 1,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (code, server, monarch_id)
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS redemptions_by_status ON redemptions (code, status)"
+            )
+
+    def settled(self, code):
+        """Return the set of (server, monarch_id) pairs with a terminal outcome for `code`"""
+        placeholders = ", ".join("?" for _ in TERMINAL_STATUSES)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT server, monarch_id FROM redemptions WHERE code = ? AND status IN ({placeholders})",
+                (code, *TERMINAL_STATUSES),
+            ).fetchall()
+        return set(rows)
+
+    def pending(self, work):
+        """Filter (server, monarch_id, code) work items down to the ones not yet settled"""
+        settled = {code: self.settled(code) for code in {item[2] for item in work}}
+        return [item for item in work if item[:2] not in settled[item[2]]]
+
+    def record(self, code, server, monarch_id, message, status, attempts=1):
+        """Store the latest outcome; `status` is an outcomes.ResultType value"""
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO redemptions (code, server, monarch_id, status, message, attempts, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (code, server, monarch_id) DO UPDATE SET
+                    status = excluded.status,
+                    message = excluded.message,
+                    attempts = redemptions.attempts + excluded.attempts,
+                    updated_at = excluded.updated_at
+            """, (code, server, monarch_id, status, message, attempts, now))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -4,149 +4,112 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
+from browser_pool import BrowserPool
+from coupon_redeemer import CouponRedemption
+from driver_resolver import resolve_chromedriver
+from outcomes import ResultType
+from server_registry import ServerRegistry, load_registry
+from ledger import RedemptionLedger
 import logging
 import os
 import sys
 
-class KingdomStoryCouponRedemption:
-    def __init__(self, coupon_code):
-        logging.basicConfig(
-            level=logging.INFO, 
-            format='%(asctime)s - %(levelname)s: %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        self.logger = logging.getLogger(__name__)
-        self.NEW_CODE = coupon_code
-        
-        # Chrome options for GitHub Actions
-        options = Options()
-        options.add_argument("--headless")  # Run headless in CI
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        
-        self.browser = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), 
-            options=options
-        )
-        
-        # Your server configurations here...
-        self.SERVERS = {
-            'US': {
-                # 'server_name': 'Conquest (US)',
-                'server_name': 'Imperial Conquest',
-                'ids': [
-                    "魔动王波涛使者", "龍之旗", "時光一如继往", "weibaibai", "魔动王风暴使者", 
-                    "shushu1", "| MoonLight |", "丨MoonLight丨"
-                ]
-            },
-            # 'TW': {
-            #     'server_name': 'Inferno (TW)',
-            #     'ids': ["weibaibai", "魔动王风暴使者"]
-            # },
-            'KOR8': {
-                'server_name': 'Blue Sky (KOR)',
-                'ids': ["ffecg", "nssnsn", "鱷魚邪惡", "初始886", "我過去總是祖", "吳若權限期",
-                        "甲魚躍升為", "午餐戶外課", "daG8", "魔動王地獄使者", "西斯其次下次"]
-            },
-            'KOR': {
-                'server_name': 'Heroic Figures(KOR)',
-                'ids': ["kpop1", "丨MoonLight丨#7", "丨MoonLight丨#1"]
-            },
-            # 'SEA': {
-            #     'server_name': 'Warlord (SEA)',
-            #     'ids': ["shushu1", "丨MoonLight丨"]
-            # },
-            'JP': {
-                'server_name': 'Invincible (JP)',
-                'ids': [
-                    "IkkiTousen", "陳羅森", "ZII5566", 
-                    "有夢想的咸魚", "李麥特", "天意", "丨MoonLight丨"
-                ]
-            },
-            '11': {
-                'server_name': 'Chu Shi Biao',
-                'ids': [
-                    "實驗室", "arkai"
-                ]
-            },
-        }
+def _create_browser():
+    # Chrome options for GitHub Actions
+    options = Options()
+    options.add_argument("--headless")  # Run headless in CI
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
     
-    def _redeem_coupon(self, server_data, monarch_id):
-        try:
-            select_server = WebDriverWait(self.browser, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "span[class='js-selected-text']"))
-            )
-            select_server.click()
+    return webdriver.Chrome(
+        service=Service(resolve_chromedriver()), 
+        options=options
+    )
 
-            server_xpath = f"//ul[@data-type='server']/li[text()='{server_data['server_name']}']"
-            self.browser.find_element(By.XPATH, server_xpath).click()
+# Shared by every redeemer in this process; parallel shards lease one session each
+BROWSER_POOL = BrowserPool(
+    _create_browser,
+    max_size=int(os.getenv('BROWSER_POOL_SIZE', os.getenv('MAX_WORKERS', '1'))),
+    idle_timeout=int(os.getenv('BROWSER_IDLE_TIMEOUT', '600')),
+    max_uses=int(os.getenv('BROWSER_MAX_USES', '50')),
+)
 
-            input_id = self.browser.find_element(By.NAME, "monarch")
-            input_id.clear()
-            input_id.send_keys(monarch_id)
+class KingdomStoryCouponRedemption(CouponRedemption):
+    """The shared redemption flow (coupon_redeemer.py) on this process's browser pool"""
+    browser_pool = BROWSER_POOL
 
-            input_code = self.browser.find_element(By.NAME, "serialcode")
-            input_code.clear()
-            input_code.send_keys(self.NEW_CODE)
+    def __init__(self, coupon_codes, backend=None, ledger=None, timeouts=None):
+        _configure_logging()
+        super().__init__(coupon_codes, backend=backend, ledger=ledger, timeouts=timeouts)
 
-            submit = self.browser.find_element(By.XPATH, "/html/body/main/form/button")
-            submit.click()
+def _configure_logging():
+    logging.basicConfig(
+        level=logging.INFO, 
+        format='%(asctime)s - %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
 
-            time.sleep(1)
-            message = WebDriverWait(self.browser, 10).until(
-                EC.presence_of_element_located((By.XPATH, "/html/body/div[2]/div/p"))
-            ).text
-            
-            self.logger.info(f"{monarch_id}: {message} - {self.NEW_CODE}")
+def run_parallel_redemption(coupon_codes, servers=None, max_workers=4, backend=None, ledger=None):
+    """Redeem across up to `max_workers` sessions; see CouponRedemption.run_parallel"""
+    _configure_logging()
+    return KingdomStoryCouponRedemption.run_parallel(coupon_codes, servers=servers, max_workers=max_workers,
+                                                     backend=backend, ledger=ledger)
 
-            close_button = self.browser.find_element(By.XPATH, "/html/body/div[2]/div/button")
-            close_button.click()
-            time.sleep(1)
+def log_report(results):
+    """Log one merged summary line per server plus every ID that did not reach a final outcome"""
+    logger = logging.getLogger(__name__)
+    logger.info("=" * 50)
+    logger.info("Redemption report")
 
-        except Exception as e:
-            self.logger.error(f"Error redeeming for {monarch_id}: {e}")
-    
-    def run_redemption(self, servers=None):
-        try:
-            self.browser.get("https://coupon.kingdom-story.com")
-
-            if servers is None:
-                servers = list(self.SERVERS.keys())
+    by_server = {}
+    for result in results:
+        by_server.setdefault(result['server'], []).append(result)
 
-            for server in servers:
-                if server not in self.SERVERS:
-                    self.logger.warning(f"Server {server} not found. Skipping.")
-                    continue
+    for server, server_results in by_server.items():
+        counts = {}
+        for r in server_results:
+            counts[r['result']] = counts.get(r['result'], 0) + 1
+        summary = ", ".join(f"{count} {result_type}" for result_type, count in sorted(counts.items()))
+        logger.info(f"{server}: {len(server_results)} submissions - {summary}")
+        for r in server_results:
+            if r['result'] in (ResultType.TRANSIENT, ResultType.UNKNOWN):
+                logger.warning(f"  {r['monarch_id']} [{r['code']}]: {r['result']} after {r['attempts']} attempt(s) - {r['message']}")
 
-                server_data = self.SERVERS[server]
-                if not server_data['ids']:
-                    self.logger.info(f"No IDs configured for {server}. Skipping.")
-                    continue
-                    
-                self.logger.info(f"Redeeming on {server} server")
-                
-                for monarch_id in server_data['ids']:
-                    self._redeem_coupon(server_data, monarch_id)
+    # Where the remaining per-ID latency goes (final attempt of each ID)
+    steps = {}
+    for r in results:
+        for step, seconds in r['timings'].items():
+            steps.setdefault(step, []).append(seconds)
+    for step, samples in steps.items():
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        logger.info(f"  {step:<14} mean {sum(samples) / len(samples):.3f}s  p95 {p95:.3f}s  (n={len(samples)})")
 
-        except Exception as e:
-            self.logger.error(f"Redemption failed: {e}")
-        finally:
-            self.browser.quit()
+    logger.info("=" * 50)
 
 def main():
-    # Get coupon code from command line argument or environment variable
-    coupon_code = sys.argv[1] if len(sys.argv) > 1 else os.getenv('COUPON_CODE', 'kingdom')
+    # Get coupon code(s) from command line arguments or environment variable; commas separate a batch
+    raw_codes = ','.join(sys.argv[1:]) if len(sys.argv) > 1 else os.getenv('COUPON_CODE', 'kingdom')
+    coupon_codes = list(dict.fromkeys(code.strip() for code in raw_codes.split(',') if code.strip()))
+    max_workers = int(os.getenv('MAX_WORKERS', '1'))
+    servers = ServerRegistry.parse_selection(os.getenv('SERVERS'))
+    unknown = load_registry().unknown(servers or [])
+    if unknown:
+        sys.exit(f"Unknown servers in SERVERS: {', '.join(unknown)}")
+    # Set REDEMPTION_LEDGER to an empty string to resubmit everything
+    ledger_path = os.getenv('REDEMPTION_LEDGER', 'redemption-ledger.sqlite3')
+    ledger = RedemptionLedger(ledger_path) if ledger_path else None
     
-    print(f"Running coupon redemption with code: {coupon_code}")
-    coupon_redeemer = KingdomStoryCouponRedemption(coupon_code)
-    coupon_redeemer.run_redemption()
+    print(f"Running coupon redemption with code(s): {', '.join(coupon_codes)}")
+    try:
+        results = run_parallel_redemption(coupon_codes, servers=servers, max_workers=max_workers, ledger=ledger)
+        log_report(results)
+    finally:
+        BROWSER_POOL.close()
+        if ledger is not None:
+            ledger.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Redemption outcome classification and retry scheduling.
+
+Every attempt is mapped to a ResultType from the site's message or the
+exception it raised. Only TRANSIENT outcomes are worth another try; the
+RetryScheduler re-queues those with exponential backoff and jitter.
+"""
+
+import heapq
+import itertools
+import random
+import re
+import time
+
+
+class ResultType:
+    SUCCESS = 'success'
+    ALREADY_REDEEMED = 'already_redeemed'
+    INVALID_CODE = 'invalid_code'
+    INVALID_ID = 'invalid_id'
+    TRANSIENT = 'transient'
+    UNKNOWN = 'unknown'
+
+
+# Outcomes that will not change if the same code is submitted again for the same ID
+TERMINAL = frozenset({
+    ResultType.SUCCESS,
+    ResultType.ALREADY_REDEEMED,
+    ResultType.INVALID_CODE,
+    ResultType.INVALID_ID,
+})
+
+# Checked in order: the first matching pattern wins.
+# - Explicit retry requests come first: "系統錯誤，請稍後再試" or "Invalid request, please try again later"
+#   must stay TRANSIENT even though they also contain a rejection word.
+# - SUCCESS is terminal (the ledger never resubmits it), so it only matches explicit success phrases,
+#   and it is checked before the bare "later" of "Rewards will arrive in your mailbox later".
+# - Rejections need their subject (code, ID) next to the error word; a bare 錯誤/invalid is not enough,
+#   only "expired" always refers to the code.
+_CODE = r'(coupon|code|serial|兌換碼|兑换码|序號|序号|禮包碼|礼包码|쿠폰|クーポン)'
+_MESSAGE_PATTERNS = [
+    (ResultType.TRANSIENT, re.compile(
+        r'try again|too many|busy|timeout|timed out|maintenance|稍後再試|稍后再试|稍後重試|稍后重试|繁忙'
+        r'|잠시 후|しばらく', re.IGNORECASE)),
+    (ResultType.SUCCESS, re.compile(
+        r'\bsuccess(ful|fully)?\b|check your (in-game )?mail|成功|已發送|已发送|請至信箱|请至信箱|성공|우편함을 확인'
+        r'|受け取りました|成功しました', re.IGNORECASE)),
+    (ResultType.ALREADY_REDEEMED, re.compile(
+        r'already\b.{0,20}\b(used|redeemed|claimed|received|collected)|has been used|used up'
+        r'|已使用|已經使用|已领取|已領取|已兌換|已兑换|이미|既に|使用済', re.IGNORECASE)),
+    (ResultType.INVALID_ID, re.compile(
+        r'\b(monarch|character|account|nickname|user|id)\b.*(not (exist|found)|invalid|incorrect|wrong)'
+        r'|\b(invalid|incorrect|unknown)\s+(monarch|character|account|nickname|user|id)\b'
+        r'|(角色|君主|帳號|账号|暱稱|昵称)\S*(不存在|錯誤|错误|無效|无效)'
+        r'|(캐릭터|군주)\S*(존재하지|없)|キャラクター\S*(存在しません|見つかりません)', re.IGNORECASE)),
+    (ResultType.INVALID_CODE, re.compile(
+        _CODE + r'.*(invalid|expired|incorrect|wrong|not (exist|found|valid)|無效|无效|過期|过期|不存在|錯誤|错误'
+        r'|유효하지|만료|無効|期限)'
+        r'|\b(invalid|expired|incorrect|wrong)\s+' + _CODE + r'|expired|過期|过期|만료', re.IGNORECASE)),
+    (ResultType.TRANSIENT, re.compile(
+        r'later|server error|稍後|稍后|잠시', re.IGNORECASE)),
+]
+
+# Negations and failure words: a message containing one of these is never read as SUCCESS
+# ("This coupon cannot be redeemed", "兌換未成功"); unmatched failures stay UNKNOWN, which is not terminal and gets resubmitted on the next run
+_FAILURE_WORDS = re.compile(
+    r"\b(not|cannot|can't|unable|fail(ed|ure)?)\b|無法|无法|不能|未成功|不成功|失敗|失败|실패|できません", re.IGNORECASE)
+
+# Exception class names (matched along the MRO) that indicate a flaky page or connection rather than a real answer
+_TRANSIENT_ERRORS = {
+    'TimeoutException', 'StaleElementReferenceException', 'NoSuchElementException',
+    'ElementClickInterceptedException', 'ElementNotInteractableException', 'WebDriverException',
+    'RequestException', 'TimeoutError', 'ConnectionError', 'OSError',
+}
+
+
+def classify(message=None, error=None):
+    """Classify one attempt from the site's response text or the exception it raised"""
+    if error is not None:
+        names = {cls.__name__ for cls in type(error).__mro__}
+        return ResultType.TRANSIENT if names & _TRANSIENT_ERRORS else ResultType.UNKNOWN
+
+    if not message or not message.strip():
+        return ResultType.TRANSIENT
+
+    for result_type, pattern in _MESSAGE_PATTERNS:
+        if result_type == ResultType.SUCCESS and _FAILURE_WORDS.search(message):
+            continue
+        if pattern.search(message):
+            return result_type
+    return ResultType.UNKNOWN
+
+
+class RetryScheduler:
+    """
+    Time-ordered work queue. Items come back out when they are due;
+    transient failures are pushed back with exponential backoff plus
+    jitter until `max_attempts` is reached.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=2.0, max_delay=60.0, jitter=0.5):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self._queue = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def backoff(self, attempt):
+        """Delay before attempt number `attempt + 1`"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter * random.random())
+
+    def add(self, item, attempt=1, delay=0.0):
+        heapq.heappush(self._queue, (time.monotonic() + delay, next(self._counter), attempt, item))
+
+    def retry(self, item, attempt):
+        """Re-queue `item` after its `attempt`-th failure; returns False once attempts are exhausted"""
+        if attempt >= self.max_attempts:
+            return False
+        self.add(item, attempt + 1, self.backoff(attempt))
+        return True
+
+    def next(self):
+        """Pop the next (item, attempt), sleeping until it is due"""
+        ready_at, _, attempt, item = heapq.heappop(self._queue)
+        wait = ready_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        return item, attempt
@@ -0,0 +1,78 @@
+"""
+Machine-readable records of the scanned announcements.
+
+Next to its README every processed folder gets announcement.json: title,
+date, detected character name and, per image, its hash, derivative
+copies, text score, duplicate link and, for OCR'd images, the cleaned
+text per strategy with confidences and timings. Images left next to the
+README that copy a scanned image are listed under stray_copies.
+
+announcements/index.jsonl holds the same records, one folder per line
+and newest first, so tools can load the whole archive in one read. It is
+updated in place: only folders re-processed in a run are replaced,
+records of removed folders are dropped, and folders missing from it are
+filled in from their announcement.json. Folders that have no
+announcement.json (last scanned before records existed, or adopted from
+the legacy processed_folders list) get one built from their README and
+images, with "ocr_backend": null and no OCR text.
+"""
+
+import json
+from pathlib import Path
+
+from atomic_write import write_atomic
+
+SIDECAR_NAME = "announcement.json"
+DEFAULT_INDEX_PATH = Path("announcements") / "index.jsonl"
+VERSION = 1
+
+
+def write_sidecar(folder_path, record):
+    write_atomic(Path(folder_path) / SIDECAR_NAME, json.dumps(record, indent=2, ensure_ascii=False) + "\n")
+
+
+class ArchiveIndex:
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        # {folder name: record}
+        self.records = {}
+        self.changed = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        self.changed = True
+                        continue
+                    if isinstance(record, dict) and record.get("folder"):
+                        self.records[record["folder"]] = record
+        except FileNotFoundError:
+            pass
+
+    def sync(self, folders):
+        """Drop records of folders that no longer exist and load missing ones from their sidecars"""
+        names = {folder.name for folder in folders}
+        for name in [name for name in self.records if name not in names]:
+            del self.records[name]
+            self.changed = True
+        for folder in folders:
+            if folder.name in self.records:
+                continue
+            try:
+                self.records[folder.name] = json.loads((folder / SIDECAR_NAME).read_text(encoding="utf-8"))
+                self.changed = True
+            except (FileNotFoundError, ValueError):
+                continue
+
+    def update(self, record):
+        self.records[record["folder"]] = record
+        self.changed = True
+
+    def save(self):
+        if not self.changed:
+            return
+        records = sorted(self.records.values(), key=lambda r: (r.get("date") or "", r["folder"]), reverse=True)
+        write_atomic(self.path, "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                                         for record in records))
+        self.changed = False
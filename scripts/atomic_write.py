@@ -0,0 +1,29 @@
+"""
+Atomic file replacement for the scanner's outputs.
+
+The processing log, OCR cache entries, JSON records and image
+derivatives are written to a temporary file next to the target and
+renamed over it, so an interrupted run never leaves a truncated file
+behind for the next one to trip over.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def write_atomic(path, data):
+    """Replace `path` with `data` (str, written as UTF-8, or bytes), creating its directory"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
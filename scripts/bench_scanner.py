@@ -0,0 +1,191 @@
+"""
+Benchmark harness for the photo scanner's per-image OCR pipeline.
+
+Runs KingdomStoryPhotoScanner.ocr_raw_text over the announcement images
+(cache disabled, one process) and records how long every stage takes per
+image: decode, the HSV/LAB/gray views, mask building, morphology, region
+proposals, upscaling and each Tesseract config. Reports throughput,
+p50/p95 latency per stage and image, and peak RSS, and writes everything
+to JSON. With --baseline the run is compared against an earlier JSON.
+
+Usage:
+    python scripts/bench_scanner.py --output bench.json
+    python scripts/bench_scanner.py --baseline bench.json --output bench-new.json
+    python scripts/bench_scanner.py --skip-ocr    # preprocessing only, no Tesseract
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import cv2
+
+from photo_scanner import IMAGE_PATTERNS, PREPROCESSING, KingdomStoryPhotoScanner
+
+
+class NullBackend:
+    """Stands in for Tesseract with --skip-ocr so only preprocessing is measured"""
+    name = "none"
+
+    def version(self):
+        return None
+
+    def recognize(self, image, config):
+        return "", None
+
+    def close(self):
+        pass
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else 0.0
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "total": round(sum(samples), 6),
+        "mean": round(sum(samples) / len(samples), 6) if samples else 0.0,
+        "p50": round(percentile(samples, 0.50), 6),
+        "p95": round(percentile(samples, 0.95), 6),
+    }
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def find_images(root, limit=None):
+    images = sorted(path for pattern in IMAGE_PATTERNS for path in Path(root).glob(f"*/images/{pattern}"))
+    return images[:limit] if limit else images
+
+
+def run_benchmark(images, ocr_backend="auto", skip_ocr=False, repeat=1, verbose=False):
+    scanner = KingdomStoryPhotoScanner(cache_dir=None, ocr_backend=ocr_backend)
+    if skip_ocr:
+        scanner.ocr = NullBackend()
+
+    stages = {}
+    per_image = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for path in images:
+            scanner.stage_times = {}
+            output = None if verbose else io.StringIO()
+            with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+                image_started = time.perf_counter()
+                scanner.ocr_raw_text(path)
+                elapsed = time.perf_counter() - image_started
+            per_image.append(elapsed)
+            for stage, seconds in scanner.stage_times.items():
+                stages.setdefault(stage, []).append(seconds)
+    wall = time.perf_counter() - started
+    scanner.ocr.close()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "platform": platform.platform(),
+            "ocr_backend": scanner.ocr.name,
+            "tesseract": scanner.ocr.version(),
+            "preprocessing": PREPROCESSING,
+            "images": len(images),
+            "repeat": repeat,
+        },
+        "wall_seconds": round(wall, 3),
+        "throughput_images_per_second": round(len(per_image) / wall, 3) if wall else None,
+        "image": summarize(per_image),
+        "stages": {stage: summarize(samples) for stage, samples in sorted(stages.items())},
+        "peak_rss_mb": peak_rss_mb(),
+        "errors": scanner.ocr_errors,
+    }
+
+
+def _change(before, after):
+    if not before:
+        return "     n/a"
+    return f"{(after - before) / before * 100:+7.1f}%"
+
+
+def print_report(result, baseline=None):
+    meta = result["meta"]
+    print(f"Images: {meta['images']} x{meta['repeat']}  backend: {meta['ocr_backend']} "
+          f"(tesseract {meta['tesseract']})  git: {meta['git']}")
+    print(f"Throughput: {result['throughput_images_per_second']} images/s  "
+          f"wall: {result['wall_seconds']}s  peak RSS: {result['peak_rss_mb']} MB  errors: {result['errors']}")
+    if baseline:
+        print(f"Baseline:   {baseline['throughput_images_per_second']} images/s  "
+              f"peak RSS: {baseline['peak_rss_mb']} MB  (git {baseline['meta'].get('git')})")
+
+    rows = [("image (total)", result["image"], (baseline or {}).get("image"))]
+    rows += [(stage, stats, (baseline or {}).get("stages", {}).get(stage)) for stage, stats in result["stages"].items()]
+    header = f"\n{'stage':<24}{'n':>6}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}"
+    print(header + (f"{'Δ mean':>10}{'Δ p95':>10}" if baseline else ""))
+    for stage, stats, before in rows:
+        line = (f"{stage:<24}{stats['count']:>6}{stats['mean'] * 1000:>10.2f}"
+                f"{stats['p50'] * 1000:>10.2f}{stats['p95'] * 1000:>10.2f}")
+        if baseline:
+            line += (f"{_change(before['mean'], stats['mean']):>10}{_change(before['p95'], stats['p95']):>10}"
+                     if before else f"{'new':>10}")
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the photo scanner OCR pipeline")
+    parser.add_argument("--root", default="announcements", help="announcement folders to read images from")
+    parser.add_argument("--limit", type=int, help="only the first N images")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the image set")
+    parser.add_argument("--ocr-backend", default="auto")
+    parser.add_argument("--skip-ocr", action="store_true", help="time preprocessing only")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show the scanner's own progress output")
+    args = parser.parse_args(argv)
+
+    images = find_images(args.root, args.limit)
+    if not images:
+        print(f"No images found under {args.root}/*/images")
+        return 1
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    result = run_benchmark(images, args.ocr_backend, args.skip_ocr, args.repeat, args.verbose)
+    print_report(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Micro-benchmark for the photo scanner's text cleanup and name extraction.
+
+Runs the precompiled clean_ocr_text / _find_name_in_text / _validate_name
+against the previous implementations (kept verbatim below as reference)
+on the archive's text: the announcement markdown files, any cached raw
+OCR output in the OCR cache, and seeded variants of both with typical OCR
+artifacts injected. Fails if any output differs, then reports timings.
+
+Usage: python scripts/bench_text_cleanup.py [--repeat N] [--cache-dir .ocr-cache]
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+from photo_scanner import KingdomStoryPhotoScanner, OCR_CORRECTIONS
+
+
+def legacy_clean_ocr_text(text):
+    if not text or not text.strip():
+        return ""
+    cleaned = re.sub(r'\s+', ' ', text).strip()
+    corrections = {
+        '技能1': '技能1', '技能l': '技能1', '技能i': '技能1', '技能I': '技能1',
+        '技能2': '技能2', '技能z': '技能2',
+        '技能3': '技能3',
+        '技能4': '技能4',
+        '傷害': '傷害', '傷寮': '傷害', '傷書': '傷害',
+        '攻擊': '攻擊', '攻書': '攻擊',
+        '武將': '武將', '武書': '武將',
+        '敵人': '敵人', '敵入': '敵人',
+        '|': '', '\\': '', '_': '',
+    }
+    for wrong, right in corrections.items():
+        cleaned = cleaned.replace(wrong, right)
+    return cleaned
+
+
+def legacy_find_name_in_text(text):
+    if not text:
+        return None
+    text_clean = text.replace(' ', '').replace('\n', '|')
+    patterns = [
+        r'新武將[：:\s]*([\u4e00-\u9fff]{2,4})',
+        r'推薦武將[：:\s]*([\u4e00-\u9fff]{2,4})',
+        r'武將介紹[：:\s]*([\u4e00-\u9fff]{2,4})',
+        r'角色[：:\s]*([\u4e00-\u9fff]{2,4})',
+        r'[\|^]([\u4e00-\u9fff]{2,4})[（\(]',
+        r'[\|^]([\u4e00-\u9fff]{2,4})[\|$]',
+        r'([\u4e00-\u9fff]{3,4})(?=\||$)',
+        r'([\u4e00-\u9fff]{2,3})(?=[\u4e00-\u9fff]{5,})',
+    ]
+    for i, pattern in enumerate(patterns):
+        match = re.search(pattern, text_clean)
+        if match:
+            name = match.group(1).strip()
+            if 2 <= len(name) <= 4:
+                return name
+    return None
+
+
+def legacy_validate_name(name):
+    if not name or len(name) < 2 or len(name) > 4:
+        return False
+    blacklist = {
+        '新增', '改版', '武將', '推薦', '介紹', '技能', '皇帝',
+        '傷害', '攻擊', '敵人', '效果', '回合', '目標',
+        '普通', '主動', '被動', '星級', '品質', '等級',
+        '防禦', '速度', '生命', '治療', '增加', '減少',
+        '上人', '一心', '中六', '計人', '安襄受這',
+        '遊戲', '更新', '活動', '獎勵', '任務',
+    }
+    if name in blacklist:
+        return False
+    if not all('\u4e00' <= char <= '\u9fff' for char in name):
+        return False
+    invalid_chars = {'技', '能', '級', '星', '品'}
+    if any(char in name for char in invalid_chars):
+        return False
+    return True
+
+
+def load_corpus(cache_dir, variants=20, seed=1234):
+    texts = [path.read_text(encoding='utf-8') for path in sorted(Path('announcements').glob('**/*.md'))]
+    for path in sorted(Path(cache_dir).glob('*/*.json')):
+        try:
+            texts.extend(json.loads(path.read_text(encoding='utf-8'))['texts'].values())
+        except (OSError, ValueError, KeyError, AttributeError):
+            continue
+    texts = [text for text in texts if isinstance(text, str)]
+
+    # Inject the artifacts the corrections target, plus line breaks for the name patterns
+    rng = random.Random(seed)
+    noise = list(OCR_CORRECTIONS) + ['\n', '  ', '技能', '傷', '新武將：', '（']
+    noisy = []
+    for _ in range(variants):
+        for text in texts:
+            chars = list(text)
+            for _ in range(max(1, len(chars) // 20)):
+                chars.insert(rng.randrange(len(chars) + 1), rng.choice(noise))
+            noisy.append(''.join(chars))
+    lines = [line for text in texts + noisy for line in text.splitlines() if line.strip()]
+    return texts + noisy + lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cache-dir', default='.ocr-cache')
+    args = parser.parse_args(argv)
+
+    scanner = KingdomStoryPhotoScanner.__new__(KingdomStoryPhotoScanner)
+    corpus = load_corpus(args.cache_dir)
+    names = [legacy_find_name_in_text(legacy_clean_ocr_text(text)) for text in corpus] + \
+            [legacy_find_name_in_text(text) for text in corpus]
+    print(f"Corpus: {len(corpus)} texts, {sum(map(len, corpus))} characters, {len(names)} name candidates")
+
+    cases = [
+        ('clean_ocr_text', legacy_clean_ocr_text, scanner.clean_ocr_text, corpus),
+        ('_find_name_in_text', legacy_find_name_in_text, scanner._find_name_in_text, corpus),
+        ('_validate_name', legacy_validate_name, scanner._validate_name, names),
+    ]
+
+    mismatches = 0
+    for label, legacy, current, inputs in cases:
+        for value in inputs:
+            if legacy(value) != current(value):
+                mismatches += 1
+                print(f"MISMATCH in {label}: {repr(value)[:60]}")
+    if mismatches:
+        print(f"❌ {mismatches} mismatching outputs")
+        return 1
+    print("✅ Outputs identical to the previous implementation")
+
+    for label, legacy, current, inputs in cases:
+        run = lambda fn: min(timeit.repeat(lambda: [fn(value) for value in inputs], number=1, repeat=args.repeat))
+        before, after = run(legacy), run(current)
+        print(f"  {label:<20} before {before * 1000:8.2f} ms  after {after * 1000:8.2f} ms  "
+              f"speedup {before / after:5.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Lightweight derivatives of the announcement images.
+
+The archive is mostly full-size JPEGs that the READMEs and the static
+site load directly. For every image this writes, into images/derived/:
+
+    <stem>.webp        display copy (at most 1080 px wide), ~3x smaller
+    <stem>.thumb.webp  320 px wide thumbnail
+    <stem>.avif        optional (--avif), when OpenCV was built with AVIF
+
+All variants of an image are encoded from one decode of the original.
+images/derived/.manifest.json records the SHA-256 each image's variants
+were built from, so unchanged images are skipped and variants of removed
+images are deleted.
+"""
+
+import json
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from atomic_write import write_atomic
+
+DERIVED_DIR = "derived"
+MANIFEST_NAME = ".manifest.json"
+
+# Part of the manifest: changing a variant rebuilds it for every image
+VARIANTS = {
+    "webp": {"suffix": ".webp", "max_width": 1080, "params": (cv2.IMWRITE_WEBP_QUALITY, 80)},
+    "thumb": {"suffix": ".thumb.webp", "max_width": 320, "params": (cv2.IMWRITE_WEBP_QUALITY, 75)},
+    "avif": {"suffix": ".avif", "max_width": 1080, "params": (getattr(cv2, "IMWRITE_AVIF_QUALITY", 512), 60)},
+}
+DEFAULT_VARIANTS = ("webp", "thumb")
+
+# The variant READMEs embed (linked to the original)
+DISPLAY_VARIANT = "webp"
+
+
+def derived_path(image_path, variant):
+    image_path = Path(image_path)
+    return image_path.parent / DERIVED_DIR / (image_path.stem + VARIANTS[variant]["suffix"])
+
+
+class DerivativeWriter:
+    def __init__(self, variants=DEFAULT_VARIANTS):
+        self.variants = []
+        for variant in variants:
+            suffix = VARIANTS[variant]["suffix"]
+            if cv2.haveImageWriter(f"x{suffix}"):
+                self.variants.append(variant)
+            else:
+                print(f"⚠️  OpenCV cannot write {suffix} images; skipping the {variant} derivatives")
+
+    def _settings(self, variant):
+        spec = VARIANTS[variant]
+        return {"suffix": spec["suffix"], "max_width": spec["max_width"], "params": list(spec["params"])}
+
+    def _is_current(self, entry, image_path, sha256):
+        return entry is not None and entry.get("sha256") == sha256 and all(
+            entry.get("variants", {}).get(variant) == self._settings(variant)
+            and derived_path(image_path, variant).exists()
+            for variant in self.variants
+        )
+
+    def _encode(self, image, variant):
+        spec = VARIANTS[variant]
+        height, width = image.shape[:2]
+        if width > spec["max_width"]:
+            image = cv2.resize(image, (spec["max_width"], round(height * spec["max_width"] / width)),
+                               interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode("." + spec["suffix"].rsplit(".", 1)[-1], image, list(spec["params"]))
+        return encoded.tobytes() if ok else None
+
+    def update_folder(self, image_files, hashes):
+        """
+        Bring one folder's derivatives up to date. `hashes` maps image
+        names to SHA-256. Returns (images built, bytes of their originals,
+        bytes of their display variants).
+        """
+        if not self.variants or not image_files:
+            return 0, 0, 0
+        derived_dir = image_files[0].parent / DERIVED_DIR
+        manifest_path = derived_dir / MANIFEST_NAME
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            manifest = {}
+        entries = manifest.get("images", {})
+
+        built = original_bytes = derived_bytes = 0
+        changed = False
+        for path in image_files:
+            sha256 = hashes[path.name]
+            if self._is_current(entries.get(path.name), path, sha256):
+                continue
+            data = path.read_bytes()
+            image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                print(f"      ❌ Could not decode {path.name} for derivatives")
+                continue
+            derived_dir.mkdir(parents=True, exist_ok=True)
+            written = {}
+            for variant in self.variants:
+                encoded = self._encode(image, variant)
+                if encoded is None:
+                    continue
+                write_atomic(derived_path(path, variant), encoded)
+                written[variant] = self._settings(variant)
+                if variant == DISPLAY_VARIANT:
+                    original_bytes += len(data)
+                    derived_bytes += len(encoded)
+            entries[path.name] = {"sha256": sha256, "variants": written}
+            built += 1
+            changed = True
+
+        # Drop derivatives of images that no longer exist
+        names = {path.name for path in image_files}
+        for name in [name for name in entries if name not in names]:
+            for variant in VARIANTS:
+                stale = derived_path(image_files[0].parent / name, variant)
+                if stale.exists():
+                    stale.unlink()
+            del entries[name]
+            changed = True
+
+        if changed:
+            write_atomic(manifest_path, json.dumps({"version": 1, "images": dict(sorted(entries.items()))},
+                                                   indent=2, ensure_ascii=False) + "\n")
+        return built, original_bytes, derived_bytes
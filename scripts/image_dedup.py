@@ -0,0 +1,95 @@
+"""
+Duplicate detection for announcement images.
+
+Images are matched first by exact content hash (SHA-256), then by two
+256-bit perceptual hashes computed on a small grayscale thumbnail:
+aHash (pixels above the mean) and dHash (horizontal gradient signs).
+Two images count as near-duplicates when their aspect ratios agree and
+both hashes are within `threshold` differing bits, which catches
+re-encoded and resized copies of the same announcement image.
+
+Announcements share a few page templates, so small (64-bit) hashes put
+different pages of the same template only a handful of bits apart; the
+larger hashes and the aspect check keep those apart.
+
+DEFAULT_THRESHOLD was measured on the archive: re-encoding an image at
+JPEG quality 60 moves its hashes by at most 11 bits, and resizing it to
+720 px wide moves them by at most 11. The closest pair of different
+images is the cheok-jun-gyeong banner with and without its title line
+(00.jpg and 528334883_...n.jpg), 14 bits apart. Every other pair of
+different images is 49 or more bits apart.
+"""
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+DEFAULT_THRESHOLD = 12
+HASH_SIZE = 16
+ASPECT_TOLERANCE = 0.02
+
+
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), "big")
+
+
+def perceptual_hashes(image_path, hash_size=HASH_SIZE):
+    """Return (aspect ratio, ahash, dhash) of an image file, or None if it cannot be decoded"""
+    data = np.frombuffer(Path(image_path).read_bytes(), np.uint8)
+    # JPEG decoders can scale by 1/8 while decoding, far cheaper than a full decode
+    gray = cv2.imdecode(data, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if gray is None:
+        return None
+
+    average = cv2.resize(gray, (hash_size, hash_size), interpolation=cv2.INTER_AREA)
+    ahash = _bits_to_int(average > average.mean())
+
+    wide = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    dhash = _bits_to_int(wide[:, 1:] > wide[:, :-1])
+    return gray.shape[1] / gray.shape[0], ahash, dhash
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class DuplicateIndex:
+    """Remembers every image seen in a run and finds the first one a new image duplicates"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._by_sha = {}
+        self._hashes = []
+
+    def _near(self, a, b):
+        aspect, ahash, dhash = a
+        other_aspect, other_ahash, other_dhash = b
+        return abs(aspect - other_aspect) <= ASPECT_TOLERANCE * other_aspect \
+            and hamming(ahash, other_ahash) <= self.threshold \
+            and hamming(dhash, other_dhash) <= self.threshold
+
+    def find(self, sha256, hashes):
+        """
+        Return the key of an indexed image with this content or these
+        hashes, or None. A negative threshold only matches exact copies.
+        """
+        if sha256 in self._by_sha:
+            return self._by_sha[sha256]
+
+        if hashes is not None and self.threshold >= 0:
+            for other_key, other_hashes in self._hashes:
+                if self._near(hashes, other_hashes):
+                    return other_key
+        return None
+
+    def match(self, key, sha256, hashes):
+        """Like find(), but non-duplicates are added to the index"""
+        original = self.find(sha256, hashes)
+        if original is not None:
+            return original
+
+        self._by_sha[sha256] = key
+        if hashes is not None:
+            self._hashes.append((key, hashes))
+        return None
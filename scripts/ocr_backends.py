@@ -0,0 +1,134 @@
+"""
+OCR engines for the photo scanner.
+
+pytesseract starts a `tesseract` process for every call, writes the
+image to a temporary file and reloads the traineddata each time.
+TesserocrBackend instead keeps one Tesseract engine per language loaded
+for the life of the process and hands it numpy buffers directly
+(SetImageBytes), switching the page segmentation mode per call.
+
+Both backends take the same pytesseract-style config strings
+("--oem 3 --psm 6 -l chi_tra"). recognize() also returns the mean word
+confidence (0-100) of the result. create_backend() picks tesserocr when
+it is installed and falls back to pytesseract otherwise.
+"""
+
+import re
+import shlex
+
+BACKENDS = ("auto", "tesserocr", "pytesseract")
+
+
+def _version_number(text):
+    match = re.search(r"\d+\.\d+(\.\d+)?", str(text or ""))
+    return match.group(0) if match else None
+
+
+class PytesseractBackend:
+    name = "pytesseract"
+
+    def __init__(self):
+        import pytesseract
+        self._pytesseract = pytesseract
+
+    def version(self):
+        try:
+            return _version_number(self._pytesseract.get_tesseract_version())
+        except Exception:
+            return None
+
+    def recognize(self, image, config):
+        """Return (text, mean word confidence or None) from a single Tesseract run"""
+        data = self._pytesseract.image_to_data(image, config=config, output_type=self._pytesseract.Output.DICT)
+        lines = {}
+        confidences = []
+        for i, word in enumerate(data["text"]):
+            confidence = float(data["conf"][i])
+            if confidence < 0 or not word.strip():
+                continue
+            line = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(line, []).append(word)
+            confidences.append(confidence)
+        text = "\n".join(" ".join(words) for words in lines.values())
+        return text, (sum(confidences) / len(confidences) if confidences else None)
+
+    def close(self):
+        pass
+
+
+class TesserocrBackend:
+    name = "tesserocr"
+
+    def __init__(self):
+        import tesserocr
+        self._tesserocr = tesserocr
+        # One loaded engine per (language, OCR engine mode); the PSM is switched per call
+        self._apis = {}
+
+    def version(self):
+        return _version_number(self._tesserocr.tesseract_version())
+
+    @staticmethod
+    def parse_config(config):
+        """Split a pytesseract config string into (lang, oem, psm, {variable: value})"""
+        lang, oem, psm, variables = "eng", 3, 3, {}
+        args = iter(shlex.split(config or ""))
+        for arg in args:
+            if arg == "-l":
+                lang = next(args)
+            elif arg == "--oem":
+                oem = int(next(args))
+            elif arg == "--psm":
+                psm = int(next(args))
+            elif arg == "-c":
+                key, _, value = next(args).partition("=")
+                variables[key] = value
+        return lang, oem, psm, variables
+
+    def _api(self, lang, oem):
+        api = self._apis.get((lang, oem))
+        if api is None:
+            api = self._tesserocr.PyTessBaseAPI(lang=lang, oem=oem)
+            self._apis[(lang, oem)] = api
+        return api
+
+    def _set_image(self, image, config):
+        lang, oem, psm, variables = self.parse_config(config)
+        api = self._api(lang, oem)
+        api.SetPageSegMode(psm)
+        for key, value in variables.items():
+            api.SetVariable(key, value)
+
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+        data = image if image.flags["C_CONTIGUOUS"] else image.copy(order="C")
+        api.SetImageBytes(data.tobytes(), width, height, channels, width * channels)
+        return api
+
+    def recognize(self, image, config):
+        """Return (text, mean word confidence or None) from a single Tesseract run"""
+        api = self._set_image(image, config)
+        try:
+            text = api.GetUTF8Text()
+            return text, (api.MeanTextConf() if text.strip() else None)
+        finally:
+            api.Clear()
+
+    def close(self):
+        for api in self._apis.values():
+            api.End()
+        self._apis.clear()
+
+
+def create_backend(name="auto"):
+    """Build the named backend; "auto" prefers tesserocr and falls back to pytesseract"""
+    name = (name or "auto").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown OCR backend '{name}' (expected one of: {', '.join(BACKENDS)})")
+    if name in ("auto", "tesserocr"):
+        try:
+            return TesserocrBackend()
+        except ImportError:
+            if name == "tesserocr":
+                raise
+    return PytesseractBackend()
@@ -0,0 +1,97 @@
+"""
+On-disk OCR result cache for the photo scanner.
+
+Entries are keyed by the SHA-256 of the image bytes together with a
+fingerprint of everything that shapes the OCR output (preprocessing
+parameters, Tesseract configs and version). An unchanged image scanned
+with unchanged settings never reaches Tesseract again.
+
+Each entry is one small JSON file holding the raw (uncleaned) text per
+strategy, so changes to the text cleaner do not invalidate the cache.
+Writes are atomic, which makes the cache safe to share between the
+scanner's worker processes. prune() keeps the directory under a size
+budget by dropping the least recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from atomic_write import write_atomic
+
+DEFAULT_DIR = ".ocr-cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def fingerprint(*parts):
+    """Stable digest of JSON-serialisable settings"""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class OcrCache:
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES, settings=None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.settings_key = fingerprint(settings)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, image_hash):
+        return hashlib.sha256(f"{image_hash}:{self.settings_key}".encode("ascii")).hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, image_hash):
+        """Return the cached {strategy: raw text} dict for an image, or None"""
+        path = self._path(self.key(image_hash))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        # Bump the mtime so prune() evicts least recently *used* entries first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry["texts"]
+
+    def put(self, image_hash, texts, source=None):
+        path = self._path(self.key(image_hash))
+        entry = {"image_hash": image_hash, "source": source, "created": int(time.time()), "texts": texts}
+        try:
+            write_atomic(path, json.dumps(entry, ensure_ascii=False))
+        except OSError as e:
+            print(f"      ⚠️  Could not write OCR cache entry: {e}")
+
+    def prune(self):
+        """Delete least recently used entries until the cache fits in max_bytes; returns the number removed"""
+        if not self.directory.exists():
+            return 0
+        entries = []
+        total = 0
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -8,22 +8,233 @@ Features:
 - Debug output for troubleshooting
 - Better text extraction and character recognition
 - Auto-generation of README files
+- Parallel OCR across images and folders with a process pool (--workers)
+- Content-hash OCR cache so unchanged images are never re-OCR'd
+- Incremental runs: only folders whose images changed since the last scan
+  (announcements/.processing-log.json) are processed; --full rescans all
+- Persistent in-process Tesseract engine via tesserocr when available
+  (--ocr-backend), falling back to pytesseract
+- Orange-text OCR sweep stops at the first confident result, with
+  per-PSM win counters to guide pruning of the config list
+- Text-region proposals: only cropped text lines are upscaled and OCR'd,
+  batched onto one canvas per image
+- Streaming pipeline (discover -> OCR -> render) with bounded queues, so
+  memory stays flat with archive size and READMEs render during OCR
+- Exact and perceptual-hash duplicate detection: duplicate images are
+  OCR'd once and linked in the README
+- Per-folder OCR budget spent on the most text-dense images, chosen by a
+  cheap text-line score on a half-size decode instead of the first three
+- WebP display copies and thumbnails in images/derived/ (AVIF optional),
+  rebuilt only when an image changes; READMEs embed the light copies
+- JSON records: announcement.json per folder (title, date, name, per-image
+  text, confidences, timings) and announcements/index.jsonl for the archive
+- Full-text search index (SQLite FTS5, trigram) over the untruncated OCR
+  text of every image; query it with scripts/search_index.py
 """
 
+import argparse
+from collections import Counter, OrderedDict, deque
 import os
 import re
 import cv2
 import numpy as np
 import glob
+import hashlib
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from PIL import Image
-import pytesseract
+from concurrent.futures import Future, ProcessPoolExecutor
+from archive_records import DEFAULT_INDEX_PATH as DEFAULT_ARCHIVE_PATH, SIDECAR_NAME, ArchiveIndex, write_sidecar
+from derivatives import DEFAULT_VARIANTS as DEFAULT_DERIVATIVES, DERIVED_DIR, DISPLAY_VARIANT, VARIANTS as DERIVATIVE_VARIANTS, \
+    DerivativeWriter, derived_path
+from image_dedup import DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD, DuplicateIndex, perceptual_hashes
+from ocr_backends import BACKENDS as OCR_BACKENDS, create_backend
+from ocr_cache import DEFAULT_DIR as DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES as DEFAULT_CACHE_BYTES, OcrCache
+from pipeline import buffered
+from processing_log import DEFAULT_PATH as DEFAULT_LOG_PATH, ProcessingLog, file_sha256
+from search_index import DEFAULT_PATH as DEFAULT_INDEX_PATH, SearchIndex, SearchIndexError
+from text_regions import compose_canvas, propose_regions, text_score
+
+IMAGE_PATTERNS = ("*.jpg", "*.png", "*.jpeg")
+
+# Images OCR'd per folder (the OCR budget); the most text-dense ones are chosen
+MAX_IMAGES_PER_FOLDER = 3
+
+# Images scoring below this (fraction of the frame in text lines, see
+# text_regions.text_score) are artwork or banners and never OCR'd
+MIN_TEXT_SCORE = 0.02
+
+# Folders waiting between two pipeline stages
+PIPELINE_QUEUE_SIZE = 2
+
+# OCR results of recent images kept in memory for their duplicates later in
+# the run; older duplicates are looked up in the OCR cache (or OCR'd) again
+RESULTS_KEPT = 256
+
+# Characters of OCR text shown per README section
+README_LIMITS = {'orange': 500, 'bright': 500, 'standard': 1500}
+
+# README image embeds that point at an original rather than a display copy
+_PLAIN_IMAGE_EMBED = re.compile(r'(?<!\[)!\[([^\]]*)\]\(images/([^)/]+)\)')
+
+# Mask and scaling parameters of the OCR strategies. They are part of the
+# OCR cache key, so changing anything here re-OCRs every image.
+PREPROCESSING = {
+    'orange_ranges': (((0, 50, 50), (40, 255, 255)),       # Orange-Yellow (0-40 in hue)
+                      ((150, 50, 50), (180, 255, 255))),   # Red (150-180 in hue)
+    'orange_scale': 4,
+    # Orange sweep stops at the first config whose mean word confidence reaches this
+    # (or whose text yields a valid character name)
+    'orange_min_confidence': 70,
+    'bright_threshold': 180,
+    'bright_scale': 4,
+    'standard_scale': 2,
+    # Region proposals (see text_regions.py); False OCRs the full upscaled frame
+    'regions': True,
+    'region_min_area': 60,
+    'region_padding': 4,
+    'region_max_coverage': 0.6,
+}
+
+
+def default_workers():
+    return int(os.getenv("SCANNER_WORKERS", "0")) or os.cpu_count() or 1
+
+
+# Common OCR corrections for Traditional Chinese (identity pairs dropped).
+# Applied in one pass by a single alternation regex; no correction's output
+# can form another pattern, so this matches the old sequential str.replace.
+OCR_CORRECTIONS = {
+    # Number corrections
+    '技能l': '技能1', '技能i': '技能1', '技能I': '技能1',
+    '技能z': '技能2',
+
+    # Common character corrections
+    '傷寮': '傷害', '傷書': '傷害',
+    '攻書': '攻擊',
+    '武書': '武將',
+    '敵入': '敵人',
+
+    # Remove common OCR artifacts
+    '|': '', '\\': '', '_': '',
+}
+_CORRECTION_PATTERN = re.compile('|'.join(map(re.escape, sorted(OCR_CORRECTIONS, key=len, reverse=True))))
+
+
+def _correct(match):
+    return OCR_CORRECTIONS[match.group(0)]
+
+
+# Character name patterns, in priority order (most specific first)
+NAME_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    # Explicit labels with character name
+    r'新武將[：:\s]*([\u4e00-\u9fff]{2,4})',           # New General: [Name]
+    r'推薦武將[：:\s]*([\u4e00-\u9fff]{2,4})',         # Recommended General: [Name]
+    r'武將介紹[：:\s]*([\u4e00-\u9fff]{2,4})',         # General Introduction: [Name]
+    r'角色[：:\s]*([\u4e00-\u9fff]{2,4})',             # Character: [Name]
+
+    # Name followed by parenthesis (common in headers)
+    r'[\|^]([\u4e00-\u9fff]{2,4})[（\(]',             # [Name]( at line start
+
+    # Name on its own line
+    r'[\|^]([\u4e00-\u9fff]{2,4})[\|$]',              # [Name] on its own line
+
+    # 3-4 character sequences (names are typically 2-4 chars)
+    r'([\u4e00-\u9fff]{3,4})(?=\||$)',                # 3-4 chars at line end
+    r'([\u4e00-\u9fff]{2,3})(?=[\u4e00-\u9fff]{5,})', # 2-3 chars followed by long text
+))
+
+# Blacklist: Common false positives for character names
+NAME_BLACKLIST = frozenset({
+    # Common words
+    '新增', '改版', '武將', '推薦', '介紹', '技能', '皇帝',
+    '傷害', '攻擊', '敵人', '效果', '回合', '目標',
+    '普通', '主動', '被動', '星級', '品質', '等級',
+    '防禦', '速度', '生命', '治療', '增加', '減少',
+
+    # Known false positives from your examples
+    '上人', '一心', '中六', '計人', '安襄受這',
+
+    # System words
+    '遊戲', '更新', '活動', '獎勵', '任務',
+})
+# Names shouldn't contain certain characters
+NAME_INVALID_CHARS = frozenset({'技', '能', '級', '星', '品'})
+_ALL_CJK = re.compile(r'[\u4e00-\u9fff]+')
+
+# Orange sweep order: sparse text suits scattered headers best and is tried first;
+# full automatic layout analysis (psm 3) is the slowest and comes last
+ORANGE_CONFIG_ORDER = ('sparse', 'standard', 'column', 'auto')
+
+# Per-image timings in the JSON records: image views count towards their strategy
+TIMING_GROUPS = {'hsv': 'orange', 'lab': 'bright', 'gray': 'standard'}
+
+
+# Each pool process builds its own scanner once instead of unpickling one per task
+_worker_scanner = None
+
+
+def _init_worker(options):
+    global _worker_scanner
+    # Tesseract starts its own OpenMP threads; with one process per core that only oversubscribes
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    _worker_scanner = KingdomStoryPhotoScanner(**options)
+
+
+def _ocr_image_task(image_path):
+    return _worker_scanner.extract_text_from_image(image_path)
+
+
+class FolderPlan:
+    """One announcement folder on its way through the scanner pipeline"""
+
+    def __init__(self, folder, image_files, fingerprint):
+        self.folder = folder
+        self.image_files = image_files
+        # {image name: {size, mtime_ns, sha256}} from the processing log
+        self.fingerprint = fingerprint
+        # Images to OCR, in README order
+        self.selected = image_files[:MAX_IMAGES_PER_FOLDER]
+        # {image path: text score} of the images considered for OCR
+        self.scores = {}
+        # {image path: path of the earlier image it duplicates}
+        self.duplicates = {}
+        # {image path outside images/: path of the image it copies}
+        self.stray_copies = {}
+
 
 class KingdomStoryPhotoScanner:
-    def __init__(self):
+    def __init__(self, workers=1, debug_mode=False, cache_dir=DEFAULT_CACHE_DIR, cache_max_bytes=DEFAULT_CACHE_BYTES,
+                 log_path=DEFAULT_LOG_PATH, incremental=True, ocr_backend="auto",
+                 dedup_threshold=DEFAULT_DEDUP_THRESHOLD, index_path=DEFAULT_INDEX_PATH,
+                 ocr_budget=MAX_IMAGES_PER_FOLDER, derivatives=DEFAULT_DERIVATIVES,
+                 archive_path=DEFAULT_ARCHIVE_PATH):
         self.announcement_dirs = []
         self.new_entries = []
+        self.log_path = log_path
+        self.incremental = incremental
+        self.workers = max(1, workers)
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.ocr_backend = ocr_backend
+        # Max differing perceptual-hash bits for near-duplicates; None turns deduplication off
+        self.dedup_threshold = dedup_threshold
+        # Full-text search index of the OCR output; None disables it
+        self.index_path = index_path
+        # Images OCR'd per folder
+        self.ocr_budget = max(1, ocr_budget)
+        # Derivative variants written to images/derived/; empty disables them
+        self.derivatives = tuple(derivatives or ())
+        self.derivative_writer = DerivativeWriter(self.derivatives) if self.derivatives else None
+        # Archive-wide JSONL index; None disables the JSON records (and folder sidecars)
+        self.archive_path = archive_path
+        self.orange_wins = Counter()
+        self.orange_early_exits = 0
+
+        # Tesseract engine; with tesserocr the traineddata stays loaded for the whole process
+        self.ocr = create_backend(ocr_backend)
        
         # Multiple OCR Configurations for Traditional Chinese
         self.ocr_configs = {
@@ -34,7 +245,36 @@ class KingdomStoryPhotoScanner:
         }
        
         # Enable debug mode (creates debug text files)
-        self.debug_mode = False
+        self.debug_mode = debug_mode
+
+        # Strategy failures (e.g. Tesseract crashes); results with errors are never cached
+        self.ocr_errors = 0
+
+        # Seconds per pipeline stage ({stage: seconds}); set to {} to collect, e.g. for benchmarks
+        self.stage_times = None
+
+        # OCR results keyed by image content + settings; cache_dir=None disables it
+        self.cache = None
+        if cache_dir:
+            self.cache = OcrCache(cache_dir, cache_max_bytes, settings={
+                'preprocessing': PREPROCESSING,
+                'ocr_configs': self.ocr_configs,
+                # The sweep stops at the first config that finds a name, so its order decides the cached result
+                'orange_config_order': ORANGE_CONFIG_ORDER,
+                'ocr_backend': self.ocr.name,
+                'tesseract': self.ocr.version(),
+                # Bumped when cached entries gain fields (2: confidences and timings)
+                'raw_format': 2,
+            })
+
+    def worker_options(self):
+        """Constructor arguments for the scanner each pool process builds"""
+        return {
+            'debug_mode': self.debug_mode,
+            'cache_dir': self.cache_dir,
+            'cache_max_bytes': self.cache_max_bytes,
+            'ocr_backend': self.ocr_backend,
+        }
 
     def find_announcement_folders(self):
         """Find all announcement folders with images"""
@@ -46,148 +286,353 @@ class KingdomStoryPhotoScanner:
         folders = []
         for folder in announcements_path.iterdir():
             if folder.is_dir() and not folder.name.startswith('.'):
-                images_path = folder / "images"
-                if images_path.exists():
-                    image_files = list(images_path.glob("*.jpg")) + \
-                                 list(images_path.glob("*.png")) + \
-                                 list(images_path.glob("*.jpeg"))
-                    if image_files:
-                        folders.append(folder)
+                if (folder / "images").exists() and self.list_images(folder):
+                    folders.append(folder)
        
         return sorted(folders)
 
-    def extract_orange_text(self, image_path):
+    def discover(self, folders, processing_log):
         """
-        Extract Orange/Red/Yellow text for headers and character names.
-        ENHANCED: Better color ranges and preprocessing
+        Discover stage: fingerprint each folder's images and yield a
+        FolderPlan for every folder that differs from the processing log.
+        Folders only listed in the legacy `processed_folders` list are
+        adopted as-is, without OCR. The derivatives of folders that are not
+        yielded are still brought up to date here.
+        """
+        for folder_path in folders:
+            name = folder_path.name
+            image_files = self.list_images(folder_path)
+            images = processing_log.fingerprint(name, image_files)
+            if self.incremental and processing_log.is_current(name, images):
+                print(f"  ⏭️  Unchanged: {name}")
+                self.refresh_derivatives(folder_path, image_files, images)
+            elif self.incremental and name in processing_log.legacy:
+                print(f"  📌 Adopted previously processed folder: {name}")
+                processing_log.record(name, images)
+                self.refresh_derivatives(folder_path, image_files, images)
+            else:
+                yield FolderPlan(folder_path, image_files, images)
+
+    def derive(self, plans):
+        """Derivative stage: write each folder's missing or outdated WebP/thumbnail copies"""
+        for plan in plans:
+            self.update_derivatives(plan.folder, plan.image_files, plan.fingerprint)
+            yield plan
+
+    def update_derivatives(self, folder_path, image_files, fingerprint):
+        """Build a folder's missing or outdated derivatives; a manifest check when they are current"""
+        if self.derivative_writer is None:
+            return 0
+        hashes = {name: entry['sha256'] for name, entry in fingerprint.items()}
+        built, before, after = self.derivative_writer.update_folder(image_files, hashes)
+        if built:
+            print(f"  🖼️  {folder_path.name}: derived {built} image(s), "
+                  f"{before / 1024:.0f} KB -> {after / 1024:.0f} KB")
+        return built
+
+    def refresh_derivatives(self, folder_path, image_files, fingerprint):
+        """
+        Derivatives of a folder that is not re-rendered in this run: bring
+        them up to date and point its README at display copies it does not
+        embed yet. Only the image embeds are rewritten, so hand-written
+        READMEs of adopted folders keep their text.
         """
+        if self.derivative_writer is None:
+            return
+        self.update_derivatives(folder_path, image_files, fingerprint)
+
+        readme_path = folder_path / "README.md"
         try:
-            img = cv2.imread(str(image_path))
-            if img is None:
-                return ""
+            with open(readme_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return
+
+        linked = 0
 
-            # Convert to HSV color space
-            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        def embed(match):
+            nonlocal linked
+            alt, name = match.groups()
+            preview = derived_path(folder_path / "images" / name, DISPLAY_VARIANT)
+            if not preview.exists():
+                return match.group(0)
+            linked += 1
+            return f"[![{alt}](images/{preview.parent.name}/{preview.name})](images/{name})"
+
+        content = _PLAIN_IMAGE_EMBED.sub(embed, content)
+        if linked:
+            with open(readme_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            print(f"  🖼️  {folder_path.name}: README now embeds {linked} display cop{'y' if linked == 1 else 'ies'}")
+
+    def dedupe(self, plans):
+        """
+        Dedup stage: link exact and near-duplicate images to the first copy
+        seen in this run. Copies of an earlier image in the same folder are
+        left out when choosing the images to OCR; copies of an image in
+        another folder reuse its OCR result. Images left next to the README
+        instead of in images/ are never scanned; those that copy an indexed
+        image are reported as safe to delete.
+        """
+        if self.dedup_threshold is None:
+            yield from plans
+            return
+
+        index = DuplicateIndex(self.dedup_threshold)
+        for plan in plans:
+            for path in plan.image_files:
+                canonical = index.match(path, plan.fingerprint[path.name]['sha256'], perceptual_hashes(path))
+                if canonical is not None:
+                    plan.duplicates[path] = canonical
+                    print(f"  🔗 {plan.folder.name}/{path.name} duplicates "
+                          f"{canonical.parent.parent.name}/{canonical.name}")
+            for path in self.list_stray_images(plan.folder):
+                original = index.find(file_sha256(path), perceptual_hashes(path))
+                if original is None:
+                    print(f"  ⚠️  {plan.folder.name}/{path.name} is outside images/ and not scanned")
+                    continue
+                plan.stray_copies[path] = original
+                print(f"  🗑️  {plan.folder.name}/{path.name} copies "
+                      f"{original.parent.parent.name}/images/{original.name} and can be deleted")
+            yield plan
+
+    def select(self, plans):
+        """Select stage: choose each folder's images to OCR within the OCR budget"""
+        for plan in plans:
+            plan.selected, plan.scores = self.select_images(plan.image_files, plan.duplicates)
+            print(f"  🎯 {plan.folder.name}: OCR {len(plan.selected)}/{len(plan.image_files)} images "
+                  f"({', '.join(path.name for path in plan.selected)})")
+            yield plan
+
+    def select_images(self, image_files, duplicates=None):
+        """
+        Score every image by text density and return (the images to OCR in
+        README order, {image path: score}). The first image is always OCR'd,
+        since it normally carries the name banner the title comes from; the
+        rest of `ocr_budget` goes to the most text-dense other images.
+        Copies of another image in the same folder and images below
+        MIN_TEXT_SCORE are skipped.
+        """
+        duplicates = duplicates or {}
+        candidates = [path for path in image_files
+                      if path not in duplicates or duplicates[path].parent != path.parent]
+        scores = {path: text_score(path) for path in candidates}
+        first, rest = candidates[:1], candidates[1:]
+        ranked = sorted(rest, key=lambda path: scores[path], reverse=True)
+        chosen = first + [path for path in ranked[:self.ocr_budget - 1] if scores[path] >= MIN_TEXT_SCORE]
+        return [path for path in image_files if path in chosen], scores
 
+    def list_images(self, folder_path):
+        """All announcement images of a folder, in README order"""
+        images_path = folder_path / "images"
+        return sorted(path for pattern in IMAGE_PATTERNS for path in images_path.glob(pattern))
+
+    def list_stray_images(self, folder_path):
+        """Images saved next to a folder's README instead of in images/"""
+        return sorted(path for pattern in IMAGE_PATTERNS for path in folder_path.glob(pattern))
+
+    def load_image(self, image_path, data=None):
+        """
+        Decode an image once. The OCR strategies work on views derived from
+        this single buffer instead of each re-reading the file. Pass `data`
+        when the file bytes were already read (e.g. for hashing).
+        """
+        if data is None:
+            data = Path(image_path).read_bytes()
+        return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+    def to_hsv(self, img):
+        """HSV view for colour-based (orange/red) text detection"""
+        return cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+
+    def to_luminance(self, img):
+        """LAB lightness channel only; the a/b channels are never needed"""
+        return cv2.extractChannel(cv2.cvtColor(img, cv2.COLOR_BGR2LAB), 0)
+
+    def to_gray(self, img):
+        """Grayscale view for standard body-text OCR"""
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    @contextmanager
+    def _timed(self, stage):
+        if self.stage_times is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_times[stage] = self.stage_times.get(stage, 0.0) + time.perf_counter() - started
+
+    def text_regions(self, mask):
+        """Candidate text boxes on a binary mask, or None to OCR the full frame"""
+        if not PREPROCESSING['regions']:
+            return None
+        return propose_regions(mask, min_area=PREPROCESSING['region_min_area'],
+                               padding=PREPROCESSING['region_padding'],
+                               max_coverage=PREPROCESSING['region_max_coverage'])
+
+    def upscale_regions(self, image, regions, scale):
+        """Upscale the whole image, or only its text regions stacked onto one canvas"""
+        if regions is None:
+            return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+        return compose_canvas(image, regions, scale)
+
+    def _debug_image_path(self, kind, image_path):
+        return image_path.parent.parent / f"debug_{kind}_{image_path.stem}.png"
+
+    def extract_orange_text(self, hsv, image_path=None):
+        """
+        Extract Orange/Red/Yellow text for headers and character names.
+        ENHANCED: Better color ranges and preprocessing
+        Takes the HSV view of the image; image_path is only used for debug output.
+        Returns (text, winning config name, whether the sweep exited early, its confidence).
+        """
+        try:
             # ENHANCED: Expanded Orange/Red/Yellow color ranges
             # Range 1: Orange-Yellow (0-40 in hue) - expanded from 0-25
-            lower_orange = np.array([0, 50, 50])        # More permissive saturation/value
-            upper_orange = np.array([40, 255, 255])     # Include more yellow-orange
-           
             # Range 2: Red (150-180 in hue) - expanded from 160-180
-            lower_red = np.array([150, 50, 50])
-            upper_red = np.array([180, 255, 255])
+            (lower_orange, upper_orange), (lower_red, upper_red) = PREPROCESSING['orange_ranges']
 
             # Create masks for both ranges
-            mask_orange = cv2.inRange(hsv, lower_orange, upper_orange)
-            mask_red = cv2.inRange(hsv, lower_red, upper_red)
-            combined_mask = cv2.bitwise_or(mask_orange, mask_red)
+            with self._timed('orange.mask'):
+                mask_orange = cv2.inRange(hsv, np.array(lower_orange), np.array(upper_orange))
+                mask_red = cv2.inRange(hsv, np.array(lower_red), np.array(upper_red))
+                combined_mask = cv2.bitwise_or(mask_orange, mask_red)
 
             # ENHANCED: Better denoising with morphological operations
-            kernel = np.ones((3, 3), np.uint8)
-            combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_CLOSE, kernel)
-            combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, kernel)
+            with self._timed('orange.morphology'):
+                kernel = np.ones((3, 3), np.uint8)
+                combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_CLOSE, kernel)
+                combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, kernel)
+
+            # Only text-like blobs are OCR'd; no blobs means no orange text at all
+            with self._timed('orange.regions'):
+                regions = self.text_regions(combined_mask)
+            if regions == []:
+                return "", None, False, None
 
-            # Invert mask (Tesseract expects black text on white background)
-            inverted = cv2.bitwise_not(combined_mask)
+            with self._timed('orange.upscale'):
+                # Invert mask (Tesseract expects black text on white background)
+                inverted = cv2.bitwise_not(combined_mask)
 
-            # ENHANCED: Higher upscaling for better character recognition (3x -> 4x)
-            upscaled = cv2.resize(inverted, None, fx=4, fy=4, interpolation=cv2.INTER_CUBIC)
+                # ENHANCED: Higher upscaling for better character recognition (3x -> 4x)
+                upscaled = self.upscale_regions(inverted, regions, PREPROCESSING['orange_scale'])
 
-            # Additional sharpening
-            kernel_sharp = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
-            upscaled = cv2.filter2D(upscaled, -1, kernel_sharp)
+                # Additional sharpening
+                kernel_sharp = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
+                upscaled = cv2.filter2D(upscaled, -1, kernel_sharp)
 
             # Save debug image if enabled
-            if self.debug_mode:
-                debug_img_path = image_path.parent.parent / f"debug_orange_{image_path.stem}.png"
-                cv2.imwrite(str(debug_img_path), upscaled)
+            if self.debug_mode and image_path is not None:
+                cv2.imwrite(str(self._debug_image_path('orange', image_path)), upscaled)
 
-            # Try multiple OCR configs and combine results
+            # Try OCR configs in order and stop at the first confident result
             texts = []
-            for config_name, config in self.ocr_configs.items():
-                text = pytesseract.image_to_string(upscaled, config=config)
-                if text.strip():
-                    texts.append(text.strip())
+            for config_name in ORANGE_CONFIG_ORDER:
+                with self._timed(f'orange.ocr.{config_name}'):
+                    text, confidence = self.ocr.recognize(upscaled, self.ocr_configs[config_name])
+                text = text.strip()
+                if not text:
+                    continue
+                if (confidence is not None and confidence >= PREPROCESSING['orange_min_confidence']) \
+                        or self._validate_name(self._find_name_in_text(self.clean_ocr_text(text))):
+                    return text, config_name, True, confidence
+                texts.append((text, config_name, confidence))
            
-            # Return the longest result (usually most complete)
-            return max(texts, key=len) if texts else ""
+            # No config was confident: return the longest result (usually most complete)
+            if texts:
+                text, config_name, confidence = max(texts, key=lambda item: len(item[0]))
+                return text, config_name, False, confidence
+            return "", None, False, None
 
         except Exception as e:
             print(f"      Error extracting orange text: {e}")
-            return ""
+            self.ocr_errors += 1
+            return "", None, False, None
 
-    def extract_bright_text(self, image_path):
+    def extract_bright_text(self, l_channel, image_path=None):
         """
         NEW: Extract bright/highlighted text (alternative to color-based extraction)
         This catches text that might be missed by HSV color filtering
+        Takes the LAB lightness channel of the image. Returns (text, confidence).
         """
         try:
-            img = cv2.imread(str(image_path))
-            if img is None:
-                return ""
-           
-            # Convert to LAB color space (better for brightness detection)
-            lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
-            l_channel, a, b = cv2.split(lab)
-           
             # Extract bright text (high luminance)
-            _, bright_mask = cv2.threshold(l_channel, 180, 255, cv2.THRESH_BINARY)
+            with self._timed('bright.mask'):
+                _, bright_mask = cv2.threshold(l_channel, PREPROCESSING['bright_threshold'], 255, cv2.THRESH_BINARY)
            
             # Clean up noise
-            kernel = np.ones((2, 2), np.uint8)
-            bright_mask = cv2.morphologyEx(bright_mask, cv2.MORPH_OPEN, kernel)
+            with self._timed('bright.morphology'):
+                kernel = np.ones((2, 2), np.uint8)
+                bright_mask = cv2.morphologyEx(bright_mask, cv2.MORPH_OPEN, kernel)
            
-            # Invert for OCR
-            inverted = cv2.bitwise_not(bright_mask)
+            with self._timed('bright.regions'):
+                regions = self.text_regions(bright_mask)
+            if regions == []:
+                return "", None
            
-            # Upscale
-            upscaled = cv2.resize(inverted, None, fx=4, fy=4, interpolation=cv2.INTER_CUBIC)
+            with self._timed('bright.upscale'):
+                # Invert for OCR
+                inverted = cv2.bitwise_not(bright_mask)
+               
+                # Upscale
+                upscaled = self.upscale_regions(inverted, regions, PREPROCESSING['bright_scale'])
            
             # Save debug image if enabled
-            if self.debug_mode:
-                debug_img_path = image_path.parent.parent / f"debug_bright_{image_path.stem}.png"
-                cv2.imwrite(str(debug_img_path), upscaled)
+            if self.debug_mode and image_path is not None:
+                cv2.imwrite(str(self._debug_image_path('bright', image_path)), upscaled)
            
             # Run OCR with sparse config (works best for bright text)
-            text = pytesseract.image_to_string(upscaled, config=self.ocr_configs['sparse'])
-            return text.strip()
+            with self._timed('bright.ocr.sparse'):
+                text, confidence = self.ocr.recognize(upscaled, self.ocr_configs['sparse'])
+            return text.strip(), confidence
            
         except Exception as e:
             print(f"      Error extracting bright text: {e}")
-            return ""
+            self.ocr_errors += 1
+            return "", None
 
-    def extract_standard_text(self, image_path):
+    def extract_standard_text(self, gray, image_path=None):
         """
         Extract all text using standard grayscale preprocessing.
         This works best for body text, descriptions, and general content.
+        Takes the grayscale view of the image. Returns (text, confidence).
         """
         try:
-            img = cv2.imread(str(image_path))
-            if img is None:
-                return ""
-           
-            # Convert to grayscale
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            # Propose regions on the frame's Otsu binarisation; artwork-heavy frames fall back to the full image
+            with self._timed('standard.mask'):
+                level, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            with self._timed('standard.regions'):
+                regions = self.text_regions(binary)
+            if regions == []:
+                return "", None
            
             # Upscale for better recognition
-            gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
-           
-            # Apply Otsu's thresholding for automatic threshold selection
-            _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            scale = PREPROCESSING['standard_scale']
+            with self._timed('standard.upscale'):
+                if regions is None:
+                    gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+                   
+                    # Apply Otsu's thresholding for automatic threshold selection
+                    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+                else:
+                    # Whole-frame Otsu level, so all crops are binarised consistently
+                    _, thresh = cv2.threshold(compose_canvas(gray, regions, scale), level, 255, cv2.THRESH_BINARY)
            
             # Save debug image if enabled
-            if self.debug_mode:
-                debug_img_path = image_path.parent.parent / f"debug_standard_{image_path.stem}.png"
-                cv2.imwrite(str(debug_img_path), thresh)
+            if self.debug_mode and image_path is not None:
+                cv2.imwrite(str(self._debug_image_path('standard', image_path)), thresh)
            
             # Run OCR with standard config
-            text = pytesseract.image_to_string(thresh, config=self.ocr_configs['standard'])
-            return text.strip()
+            with self._timed('standard.ocr.standard'):
+                text, confidence = self.ocr.recognize(thresh, self.ocr_configs['standard'])
+            return text.strip(), confidence
 
         except Exception as e:
             print(f"      Error extracting standard text: {e}")
-            return ""
+            self.ocr_errors += 1
+            return "", None
 
     def extract_text_from_image(self, image_path):
         """
@@ -199,24 +644,38 @@ class KingdomStoryPhotoScanner:
         """
         print(f"    📸 Extracting text from: {image_path.name}")
        
-        # Strategy 1: Orange/Red text (headers and character names)
-        print(f"      🔶 Extracting orange text...")
-        orange_text = self.extract_orange_text(image_path)
-       
-        # Strategy 2: Bright text (alternative detection method)
-        print(f"      💡 Extracting bright text...")
-        bright_text = self.extract_bright_text(image_path)
+        data = Path(image_path).read_bytes()
+        image_hash = hashlib.sha256(data).hexdigest()
+        raw = self.cache.get(image_hash) if self.cache and not self.debug_mode else None
        
-        # Strategy 3: Standard grayscale (all text including body)
-        print(f"      📄 Extracting standard text...")
-        standard_text = self.extract_standard_text(image_path)
-       
-        # Clean all extracted text
+        cached = raw is not None
+        if cached:
+            print(f"      ♻️  Using cached OCR result")
+        else:
+            errors = self.ocr_errors
+            raw = self.ocr_raw_text(image_path, data)
+            if raw is None:
+                return {'orange': '', 'bright': '', 'standard': '', 'full': ''}
+            if self.cache and self.ocr_errors == errors:
+                self.cache.put(image_hash, raw, source=str(image_path))
+       
+        orange_text, bright_text, standard_text = raw['orange'], raw['bright'], raw['standard']
+       
+        # Clean each strategy's text once; 'full' is built from the cleaned parts
+        orange = self.clean_ocr_text(orange_text)
+        bright = self.clean_ocr_text(bright_text)
+        standard = self.clean_ocr_text(standard_text)
         combined_text = {
-            'orange': self.clean_ocr_text(orange_text),
-            'bright': self.clean_ocr_text(bright_text),
-            'standard': self.clean_ocr_text(standard_text),
-            'full': self.clean_ocr_text(orange_text + "\n\n" + bright_text + "\n\n" + standard_text)
+            'orange': orange,
+            'bright': bright,
+            'standard': standard,
+            'full': ' '.join(part for part in (orange, bright, standard) if part),
+            'orange_config': raw.get('orange_config'),
+            'orange_early_exit': raw.get('orange_early_exit', False),
+            'confidence': raw.get('confidence', {}),
+            # Seconds per strategy when this image was OCR'd (possibly in an earlier, cached run)
+            'timings': raw.get('timings', {}),
+            'cached': cached,
         }
        
         # Save debug text file if enabled
@@ -242,36 +701,73 @@ class KingdomStoryPhotoScanner:
         print(f"      ✅ Extraction complete")
         return combined_text
 
-    def clean_ocr_text(self, text):
-        """Clean and correct common OCR errors in Traditional Chinese"""
-        if not text or not text.strip():
-            return ""
+    def ocr_raw_text(self, image_path, data=None):
+        """
+        Run all three strategies on one image and return their uncleaned
+        text, or None if it cannot be decoded. The result also carries each
+        strategy's confidence and seconds spent per strategy.
+        """
+        # Time this image on its own, then add it to the caller's totals (if collected)
+        outer, self.stage_times = self.stage_times, {}
+        try:
+            raw = self._run_strategies(image_path, data)
+        finally:
+            stage_times, self.stage_times = self.stage_times, outer
+            if outer is not None:
+                for stage, seconds in stage_times.items():
+                    outer[stage] = outer.get(stage, 0.0) + seconds
+        if raw is not None:
+            timings = {}
+            for stage, seconds in stage_times.items():
+                strategy = TIMING_GROUPS.get(stage, stage.split('.')[0])
+                timings[strategy] = timings.get(strategy, 0.0) + seconds
+            raw['timings'] = {strategy: round(seconds, 4) for strategy, seconds in timings.items()}
+        return raw
+
+    def _run_strategies(self, image_path, data):
+        # Decode once; each strategy gets its own view of the same buffer
+        with self._timed('decode'):
+            img = self.load_image(image_path, data)
+        if img is None:
+            print(f"      ❌ Could not decode image")
+            return None
        
-        # Remove excessive whitespace
-        cleaned = re.sub(r'\s+', ' ', text).strip()
+        # Strategy 1: Orange/Red text (headers and character names)
+        print(f"      🔶 Extracting orange text...")
+        with self._timed('hsv'):
+            hsv = self.to_hsv(img)
+        orange_text, orange_config, early_exit, orange_confidence = self.extract_orange_text(hsv, image_path)
+        del hsv
        
-        # Common OCR corrections for Traditional Chinese
-        corrections = {
-            # Number corrections
-            '技能1': '技能1', '技能l': '技能1', '技能i': '技能1', '技能I': '技能1',
-            '技能2': '技能2', '技能z': '技能2',
-            '技能3': '技能3',
-            '技能4': '技能4',
-           
-            # Common character corrections
-            '傷害': '傷害', '傷寮': '傷害', '傷書': '傷害',
-            '攻擊': '攻擊', '攻書': '攻擊',
-            '武將': '武將', '武書': '武將',
-            '敵人': '敵人', '敵入': '敵人',
-           
-            # Remove common OCR artifacts
-            '|': '', '\\': '', '_': '',
-        }
+        # Strategy 2: Bright text (alternative detection method)
+        print(f"      💡 Extracting bright text...")
+        with self._timed('lab'):
+            l_channel = self.to_luminance(img)
+        bright_text, bright_confidence = self.extract_bright_text(l_channel, image_path)
+        del l_channel
        
-        for wrong, right in corrections.items():
-            cleaned = cleaned.replace(wrong, right)
+        # Strategy 3: Standard grayscale (all text including body)
+        print(f"      📄 Extracting standard text...")
+        with self._timed('gray'):
+            gray = self.to_gray(img)
+        del img
+        standard_text, standard_confidence = self.extract_standard_text(gray, image_path)
+       
+        confidence = {'orange': orange_confidence, 'bright': bright_confidence, 'standard': standard_confidence}
+        return {'orange': orange_text, 'bright': bright_text, 'standard': standard_text,
+                'orange_config': orange_config, 'orange_early_exit': early_exit,
+                'confidence': {strategy: None if value is None else round(float(value), 1)
+                               for strategy, value in confidence.items()}}
+
+    def clean_ocr_text(self, text):
+        """Clean and correct common OCR errors in Traditional Chinese"""
+        if not text:
+            return ""
        
-        return cleaned
+        # Collapse whitespace (str.split() splits on the same characters as \s+),
+        # then apply all OCR_CORRECTIONS in one pass
+        cleaned = ' '.join(text.split())
+        return _CORRECTION_PATTERN.sub(_correct, cleaned)
 
     def extract_character_name(self, text_dict):
         """
@@ -331,27 +827,8 @@ class KingdomStoryPhotoScanner:
         # Clean text: remove spaces, make line breaks visible with |
         text_clean = text.replace(' ', '').replace('\n', '|')
        
-        # Pattern priority order (most specific first)
-        patterns = [
-            # Explicit labels with character name
-            r'新武將[：:\s]*([\u4e00-\u9fff]{2,4})',           # New General: [Name]
-            r'推薦武將[：:\s]*([\u4e00-\u9fff]{2,4})',         # Recommended General: [Name]
-            r'武將介紹[：:\s]*([\u4e00-\u9fff]{2,4})',         # General Introduction: [Name]
-            r'角色[：:\s]*([\u4e00-\u9fff]{2,4})',             # Character: [Name]
-           
-            # Name followed by parenthesis (common in headers)
-            r'[\|^]([\u4e00-\u9fff]{2,4})[（\(]',             # [Name]( at line start
-           
-            # Name on its own line
-            r'[\|^]([\u4e00-\u9fff]{2,4})[\|$]',              # [Name] on its own line
-           
-            # 3-4 character sequences (names are typically 2-4 chars)
-            r'([\u4e00-\u9fff]{3,4})(?=\||$)',                # 3-4 chars at line end
-            r'([\u4e00-\u9fff]{2,3})(?=[\u4e00-\u9fff]{5,})', # 2-3 chars followed by long text
-        ]
-       
-        for i, pattern in enumerate(patterns):
-            match = re.search(pattern, text_clean)
+        for pattern in NAME_PATTERNS:
+            match = pattern.search(text_clean)
             if match:
                 name = match.group(1).strip()
                 if 2 <= len(name) <= 4:
@@ -366,48 +843,27 @@ class KingdomStoryPhotoScanner:
         if not name or len(name) < 2 or len(name) > 4:
             return False
        
-        # Blacklist: Common false positives
-        blacklist = {
-            # Common words
-            '新增', '改版', '武將', '推薦', '介紹', '技能', '皇帝',
-            '傷害', '攻擊', '敵人', '效果', '回合', '目標',
-            '普通', '主動', '被動', '星級', '品質', '等級',
-            '防禦', '速度', '生命', '治療', '增加', '減少',
-           
-            # Known false positives from your examples
-            '上人', '一心', '中六', '計人', '安襄受這',
-           
-            # System words
-            '遊戲', '更新', '活動', '獎勵', '任務',
-        }
-       
-        if name in blacklist:
+        if name in NAME_BLACKLIST:
             return False
        
         # Must be all Chinese characters
-        if not all('\u4e00' <= char <= '\u9fff' for char in name):
+        if not _ALL_CJK.fullmatch(name):
             return False
        
         # Additional validation: names shouldn't contain certain characters
-        invalid_chars = {'技', '能', '級', '星', '品'}
-        if any(char in name for char in invalid_chars):
+        if not NAME_INVALID_CHARS.isdisjoint(name):
             return False
        
         return True
 
-    def generate_title_from_folder(self, folder_name, text_dict):
-        """
-        Generate title combining folder English name + OCR Chinese name.
-        """
+    def format_title(self, folder_name, chinese_name):
+        """Title from the folder's English name and the detected Chinese name (or None)"""
         # Extract English name from folder
         clean_name = re.sub(r'^\d{4}-\d{1,2}-\d{1,2}-?', '', folder_name)
         clean_name = re.sub(r'Emperor-Rarity-', '', clean_name, flags=re.IGNORECASE)
         clean_name = re.sub(r'New-Character-', '', clean_name, flags=re.IGNORECASE)
         english_name = clean_name.replace('-', ' ').title()
        
-        # Extract Chinese name from OCR
-        chinese_name = self.extract_character_name(text_dict)
-       
         # Generate title
         if chinese_name:
             return f"新武將介紹 - {chinese_name} ({english_name})"
@@ -438,49 +894,213 @@ class KingdomStoryPhotoScanner:
         # Fallback to current date if no pattern matches
         return datetime.now().strftime("%Y-%m-%d")
         
-    def process_folder(self, folder_path):
-        """Process a single announcement folder"""
+    def ocr_folders(self, plans):
+        """
+        OCR stage: yield (plan, text dicts) per folder, in folder order.
+        With more than one worker the images are spread over a process pool
+        with at most two images per worker in flight, so results never pile
+        up ahead of the render stage. Duplicates of one of the RESULTS_KEPT
+        most recently used images, or of one still in flight, reuse its
+        result.
+        """
+        # Text dicts of recently used canonical images, least recently used first
+        recent = OrderedDict()
+
+        def remember(key, text_dict):
+            recent[key] = text_dict
+            recent.move_to_end(key)
+            if len(recent) > RESULTS_KEPT:
+                recent.popitem(last=False)
+
+        if self.workers <= 1:
+            for plan in plans:
+                text_dicts = []
+                for path in plan.selected:
+                    key = plan.duplicates.get(path, path)
+                    remember(key, recent[key] if key in recent else self.extract_text_from_image(path))
+                    text_dicts.append(recent[key])
+                yield plan, text_dicts
+            return
+
+        print(f"\n⚙️  OCR on {self.workers} worker process(es)")
+        window = self.workers * 2
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.worker_options(),)) as pool:
+            # Futures of canonical images submitted by folders not yet yielded
+            running = {}
+            # (plan, [(key, future or text dict)], keys this folder submitted)
+            pending = deque()
+            in_flight = 0
+
+            def finish():
+                done_plan, items, submitted = pending.popleft()
+                text_dicts = [item.result() if isinstance(item, Future) else item for _, item in items]
+                for key in submitted:
+                    remember(key, running.pop(key).result())
+                return done_plan, text_dicts, len(submitted)
+
+            for plan in plans:
+                items = []
+                submitted = set()
+                for path in plan.selected:
+                    key = plan.duplicates.get(path, path)
+                    if key in recent:
+                        remember(key, recent[key])
+                        items.append((key, recent[key]))
+                        continue
+                    if key not in running:
+                        running[key] = pool.submit(_ocr_image_task, path)
+                        submitted.add(key)
+                        in_flight += 1
+                    items.append((key, running[key]))
+                pending.append((plan, items, submitted))
+                while pending and in_flight > window:
+                    done_plan, text_dicts, finished = finish()
+                    in_flight -= finished
+                    yield done_plan, text_dicts
+            while pending:
+                done_plan, text_dicts, _ = finish()
+                yield done_plan, text_dicts
+
+    def folder_record(self, plan, text_dicts, entry):
+        """The JSON record of a rendered folder (see archive_records.py)"""
+        ocr_results = dict(zip(plan.selected, text_dicts))
+        images = []
+        for path in plan.image_files:
+            image = {'name': path.name, 'sha256': plan.fingerprint[path.name]['sha256']}
+            derived = {variant: f"images/{DERIVED_DIR}/{derived_path(path, variant).name}"
+                       for variant in DERIVATIVE_VARIANTS if derived_path(path, variant).exists()}
+            if derived:
+                image['derived'] = derived
+            if path in plan.scores:
+                image['text_score'] = round(plan.scores[path], 4)
+            original = plan.duplicates.get(path)
+            if original is not None:
+                image['duplicate_of'] = original.name if original.parent == path.parent \
+                    else f"{original.parent.parent.name}/{original.name}"
+            text_dict = ocr_results.get(path)
+            if text_dict:
+                image['ocr'] = {key: text_dict.get(key) for key in
+                                ('orange', 'bright', 'standard', 'orange_config', 'confidence', 'timings', 'cached')}
+            images.append(image)
+
+        record = {
+            'version': 1,
+            'folder': plan.folder.name,
+            'title': entry['title'],
+            'date': entry['date'],
+            'character_name': entry['character_name'],
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'ocr_backend': self.ocr.name,
+            'images': images,
+        }
+        if plan.stray_copies:
+            record['stray_copies'] = [
+                {'name': path.name,
+                 'duplicate_of': f"images/{original.name}" if original.parent.parent == plan.folder
+                 else f"{original.parent.parent.name}/images/{original.name}"}
+                for path, original in plan.stray_copies.items()
+            ]
+        return record
+
+    def readme_record(self, folder_path, processing_log):
+        """
+        The JSON record of a folder that has no announcement.json, e.g. one
+        adopted from the legacy processed_folders list: title from its README
+        heading, images and derivatives as on disk, no OCR text. Rescanning
+        the folder (--full) replaces it with a complete record.
+        """
+        image_files = self.list_images(folder_path)
+        plan = FolderPlan(folder_path, image_files, processing_log.fingerprint(folder_path.name, image_files))
+        plan.selected = []
+        title = None
+        try:
+            with open(folder_path / "README.md", "r", encoding="utf-8") as f:
+                heading = f.readline()
+            if heading.startswith("# "):
+                title = heading[2:].strip()
+        except FileNotFoundError:
+            pass
+        record = self.folder_record(plan, [], {
+            'title': title or self.format_title(folder_path.name, None),
+            'date': self.extract_date_from_folder(folder_path.name),
+            'character_name': None,
+        })
+        record['ocr_backend'] = None
+        return record
+
+    def open_search_index(self):
+        if not self.index_path:
+            return None
+        try:
+            return SearchIndex(self.index_path)
+        except SearchIndexError as e:
+            print(f"⚠️  Search index disabled: {e}")
+            return None
+
+    def count_orange_config(self, text_dict):
+        if text_dict and text_dict.get('orange_config'):
+            self.orange_wins[text_dict['orange_config']] += 1
+            self.orange_early_exits += bool(text_dict.get('orange_early_exit'))
+
+    def report_orange_configs(self):
+        """Print how often each OCR config won the orange sweep, to guide pruning ORANGE_CONFIG_ORDER"""
+        if not self.orange_wins:
+            return
+        print(f"\n🏆 Orange OCR config wins ({self.orange_early_exits}/{sum(self.orange_wins.values())} early exits):")
+        for config_name in ORANGE_CONFIG_ORDER:
+            print(f"     {config_name:<9} {self.orange_wins.get(config_name, 0)}")
+
+    @staticmethod
+    def _join_limited(texts, limit):
+        """Join texts with blank lines, stopping one character past `limit` (enough to mark truncation)"""
+        parts = []
+        size = 0
+        for text in texts:
+            if not text:
+                continue
+            if parts:
+                parts.append('\n\n')
+                size += 2
+            parts.append(text[:limit + 1 - size])
+            size += len(parts[-1])
+            if size > limit:
+                break
+        return ''.join(parts)[:limit + 1]
+
+    def write_folder(self, folder_path, image_files, text_dicts, duplicates=None):
+        """Phase 3: build the folder README from the OCR results of its selected images"""
         print(f"\n{'='*70}")
         print(f"📁 Processing folder: {folder_path.name}")
         print('='*70)
        
-        images_path = folder_path / "images"
         readme_path = folder_path / "README.md"
        
-        # Find all images
-        image_files = sorted(list(images_path.glob("*.jpg")) +
-                           list(images_path.glob("*.png")) +
-                           list(images_path.glob("*.jpeg")))
-       
         if not image_files:
             print("  ⚠️  No images found")
             return False
        
-        print(f"  ✅ Found {len(image_files)} images")
-       
-        # Extract text from first few images (character info usually in first images)
-        all_text_dicts = []
-        num_images_to_process = min(3, len(image_files))
+        print(f"  ✅ Found {len(image_files)} images, OCR'd {len(text_dicts)}")
        
-        print(f"\n  Processing {num_images_to_process} image(s) for text extraction:")
-        for i, img_path in enumerate(image_files[:num_images_to_process], 1):
-            print(f"\n  [{i}/{num_images_to_process}] {img_path.name}")
-            text_dict = self.extract_text_from_image(img_path)
-            if text_dict and text_dict.get('full'):
-                all_text_dicts.append(text_dict)
+        all_text_dicts = [text_dict for text_dict in text_dicts if text_dict and text_dict.get('full')]
        
         if not all_text_dicts:
             print("\n  ❌ No text extracted from any images")
             return False
        
-        # Combine all extracted text for README
-        combined_orange = '\n\n'.join([t['orange'] for t in all_text_dicts if t.get('orange')])
-        combined_bright = '\n\n'.join([t['bright'] for t in all_text_dicts if t.get('bright')])
-        combined_standard = '\n\n'.join([t['standard'] for t in all_text_dicts if t.get('standard')])
+        # Combine extracted text for README, only as much as the README shows
+        combined_orange = self._join_limited((t.get('orange') for t in all_text_dicts), README_LIMITS['orange'])
+        combined_bright = self._join_limited((t.get('bright') for t in all_text_dicts), README_LIMITS['bright'])
+        combined_standard = self._join_limited((t.get('standard') for t in all_text_dicts), README_LIMITS['standard'])
        
-        # Generate title (use first image's text for character name)
+        # Generate title from the first OCR'd image that yields a valid character name
         print(f"\n  🏷️  Generating title...")
-        title = self.generate_title_from_folder(folder_path.name, all_text_dicts[0])
+        character_name = None
+        for text_dict in all_text_dicts:
+            character_name = self.extract_character_name(text_dict)
+            if character_name:
+                break
+        title = self.format_title(folder_path.name, character_name)
        
         print(f"  ✅ Generated title: {title}")
        
@@ -489,6 +1109,7 @@ class KingdomStoryPhotoScanner:
             title=title,
             folder_name=folder_path.name,
             image_files=image_files,
+            duplicates=duplicates,
             orange_text=combined_orange,
             bright_text=combined_bright,
             standard_text=combined_standard
@@ -505,12 +1126,14 @@ class KingdomStoryPhotoScanner:
         self.new_entries.append({
             'date': folder_date,
             'title': title,
-            'folder': folder_path.name
+            'folder': folder_path.name,
+            'character_name': character_name,
         })
        
         return True
 
-    def _generate_readme_content(self, title, folder_name, image_files, orange_text, bright_text, standard_text):
+    def _generate_readme_content(self, title, folder_name, image_files, orange_text, bright_text, standard_text,
+                                 duplicates=None):
         """Generate README.md content"""
         content = f"# {title}\n\n"
         content += f"**Folder:** `{folder_name}`  \n"
@@ -520,7 +1143,19 @@ class KingdomStoryPhotoScanner:
         content += "## 📷 Announcement Images\n\n"
        
         for img in image_files:
-            content += f"![{img.stem}](images/{img.name})\n\n"
+            # Embed the light display copy when there is one, linked to the original
+            preview = derived_path(img, DISPLAY_VARIANT)
+            if preview.exists():
+                content += f"[![{img.stem}](images/{preview.parent.name}/{preview.name})](images/{img.name})\n\n"
+            else:
+                content += f"![{img.stem}](images/{img.name})\n\n"
+            original = (duplicates or {}).get(img)
+            if original is not None:
+                if original.parent == img.parent:
+                    content += f"*Duplicate of [{original.name}](images/{original.name})*\n\n"
+                else:
+                    other = original.parent.parent.name
+                    content += f"*Duplicate of [{other}/{original.name}](../{other}/images/{original.name})*\n\n"
        
         content += "---\n\n"
        
@@ -528,24 +1163,24 @@ class KingdomStoryPhotoScanner:
         if orange_text:
             content += "## 🔶 Character Name & Headers (Orange Text Detection)\n\n"
             content += "```\n"
-            content += orange_text[:500]  # Limit length
-            if len(orange_text) > 500:
+            content += orange_text[:README_LIMITS['orange']]  # Limit length
+            if len(orange_text) > README_LIMITS['orange']:
                 content += "\n... (truncated)"
             content += "\n```\n\n"
        
         if bright_text:
             content += "## 💡 Highlighted Text (Brightness Detection)\n\n"
             content += "```\n"
-            content += bright_text[:500]  # Limit length
-            if len(bright_text) > 500:
+            content += bright_text[:README_LIMITS['bright']]  # Limit length
+            if len(bright_text) > README_LIMITS['bright']:
                 content += "\n... (truncated)"
             content += "\n```\n\n"
        
         if standard_text:
             content += "## 📝 Skills & Description (Standard OCR)\n\n"
             content += "```\n"
-            content += standard_text[:1500]  # Limit length
-            if len(standard_text) > 1500:
+            content += standard_text[:README_LIMITS['standard']]  # Limit length
+            if len(standard_text) > README_LIMITS['standard']:
                 content += "\n... (truncated)"
             content += "\n```\n\n"
        
@@ -616,29 +1251,80 @@ class KingdomStoryPhotoScanner:
             print("\n❌ No announcement folders found")
             return
        
-        print(f"\n✅ Found {len(folders)} announcement folder(s) to process")
+        print(f"\n✅ Found {len(folders)} announcement folder(s)")
        
+        print(f"🔤 OCR backend: {self.ocr.name}" + ("" if self.incremental else " (full rescan)"))
         if self.debug_mode:
             print(f"🐛 Debug mode enabled - will save debug files")
        
-        # Process each folder
+        # Streaming pipeline: discover -> derive -> dedupe -> select -> OCR (decode, preprocess, OCR, clean) -> render.
+        # Each stage runs ahead of the next by at most PIPELINE_QUEUE_SIZE folders.
+        processing_log = ProcessingLog(self.log_path)
+        search_index = self.open_search_index()
+        if search_index:
+            filled = search_index.sync(folders)
+            if filled:
+                print(f"🔎 Search index: filled in {filled} folder(s) from {SIDECAR_NAME}")
+        archive = ArchiveIndex(self.archive_path) if self.archive_path else None
+        if archive:
+            archive.sync(folders)
+        plans = buffered(self.discover(folders, processing_log), PIPELINE_QUEUE_SIZE, name="scanner-discover")
+        results = buffered(self.ocr_folders(self.select(self.dedupe(self.derive(plans)))), PIPELINE_QUEUE_SIZE, name="scanner-ocr")
+       
+        # Render stage: name extraction and READMEs, folder by folder, in folder order
+        processed_count = 0
         success_count = 0
-        for i, folder in enumerate(folders, 1):
+        for plan, text_dicts in results:
+            processed_count += 1
             print(f"\n{'#'*70}")
-            print(f"# Processing {i}/{len(folders)}")
+            print(f"# Processing {processed_count}: {plan.folder.name}")
             print(f"{'#'*70}")
-            if self.process_folder(folder):
+            for text_dict in text_dicts:
+                self.count_orange_config(text_dict)
+            if search_index:
+                search_index.update_folder(plan.folder.name, [
+                    (path.name, plan.fingerprint[path.name]['sha256'], text_dict)
+                    for path, text_dict in zip(plan.selected, text_dicts) if text_dict
+                ])
+            if self.write_folder(plan.folder, plan.image_files, text_dicts, plan.duplicates):
+                if archive:
+                    record = self.folder_record(plan, text_dicts, self.new_entries[-1])
+                    write_sidecar(plan.folder, record)
+                    archive.update(record)
+                processing_log.record(plan.folder.name, plan.fingerprint)
                 success_count += 1
        
+        if archive:
+            # Unchanged folders without a sidecar (scanned before records existed, or adopted) still get one
+            for folder in folders:
+                if folder.name not in archive.records:
+                    record = self.readme_record(folder, processing_log)
+                    write_sidecar(folder, record)
+                    archive.update(record)
+                    print(f"🗂️  {folder.name}: wrote {SIDECAR_NAME} from its README (no OCR text)")
+        processing_log.save()
+        if archive:
+            archive.save()
+        if search_index:
+            search_index.close()
+        self.report_orange_configs()
+       
         # Update main README
         if self.new_entries:
             self.update_main_readme()
        
+        self.ocr.close()
+       
+        if self.cache:
+            removed = self.cache.prune()
+            if removed:
+                print(f"\n🧹 Evicted {removed} old OCR cache entr{'y' if removed == 1 else 'ies'}")
+       
         # Summary
         print("\n" + "="*70)
         print("  🎉 PROCESSING COMPLETE")
         print("="*70)
-        print(f"  ✅ Successfully processed: {success_count}/{len(folders)} folders")
+        print(f"  ✅ Successfully processed: {success_count}/{processed_count} changed folders")
         print(f"  📝 New entries added to README: {len(self.new_entries)}")
        
         if self.debug_mode:
@@ -650,6 +1336,54 @@ class KingdomStoryPhotoScanner:
        
         print("="*70 + "\n")
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate README files for Kingdom Story announcement images")
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="OCR worker processes (default: SCANNER_WORKERS or CPU count; 1 disables the pool)")
+    parser.add_argument("--debug", action="store_true", help="save debug mask images next to each folder")
+    parser.add_argument("--cache-dir", default=os.getenv("OCR_CACHE_DIR", DEFAULT_CACHE_DIR),
+                        help="OCR result cache directory (default: OCR_CACHE_DIR or .ocr-cache)")
+    parser.add_argument("--cache-max-mb", type=float,
+                        default=float(os.getenv("OCR_CACHE_MAX_MB", DEFAULT_CACHE_BYTES / (1024 * 1024))),
+                        help="evict least recently used cache entries above this size")
+    parser.add_argument("--no-cache", action="store_true", help="always run OCR, ignoring the cache")
+    parser.add_argument("--full", action="store_true",
+                        help="process every folder, not only those whose images changed since the last run")
+    parser.add_argument("--ocr-backend", choices=OCR_BACKENDS, default=os.getenv("OCR_BACKEND", "auto"),
+                        help="tesserocr keeps Tesseract loaded in-process; auto falls back to pytesseract")
+    parser.add_argument("--dedup-threshold", type=int,
+                        default=int(os.getenv("SCANNER_DEDUP_THRESHOLD", DEFAULT_DEDUP_THRESHOLD)),
+                        help="max differing perceptual-hash bits (of 256) for near-duplicate images; "
+                             "-1 matches exact copies only")
+    parser.add_argument("--no-dedup", action="store_true", help="OCR duplicate images separately")
+    parser.add_argument("--ocr-budget", type=int,
+                        default=int(os.getenv("SCANNER_OCR_BUDGET", MAX_IMAGES_PER_FOLDER)),
+                        help="images OCR'd per folder, the most text-dense first (default: %(default)s)")
+    parser.add_argument("--avif", action="store_true", help="also write AVIF derivatives (if OpenCV supports it)")
+    parser.add_argument("--no-derivatives", action="store_true",
+                        help="do not write WebP/thumbnail copies to images/derived/")
+    parser.add_argument("--archive-index", default=str(DEFAULT_ARCHIVE_PATH),
+                        help="JSONL index of all folder records (announcement.json)")
+    parser.add_argument("--no-records", action="store_true",
+                        help="do not write announcement.json records or the archive index")
+    parser.add_argument("--index", default=os.getenv("SCANNER_INDEX", DEFAULT_INDEX_PATH),
+                        help="full-text search index of the OCR output (query with scripts/search_index.py)")
+    parser.add_argument("--no-index", action="store_true", help="do not update the search index")
+    parser.add_argument("--log", default=str(DEFAULT_LOG_PATH), help="processing log / fingerprint manifest path")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    scanner = KingdomStoryPhotoScanner()
+    args = parse_args()
+    scanner = KingdomStoryPhotoScanner(workers=args.workers, debug_mode=args.debug,
+                                       cache_dir=None if args.no_cache else args.cache_dir,
+                                       cache_max_bytes=int(args.cache_max_mb * 1024 * 1024),
+                                       log_path=args.log, incremental=not args.full,
+                                       ocr_backend=args.ocr_backend,
+                                       dedup_threshold=None if args.no_dedup else args.dedup_threshold,
+                                       index_path=None if args.no_index else args.index,
+                                       ocr_budget=args.ocr_budget,
+                                       derivatives=() if args.no_derivatives
+                                       else DEFAULT_DERIVATIVES + (('avif',) if args.avif else ()),
+                                       archive_path=None if args.no_records else args.archive_index)
     scanner.run()
@@ -0,0 +1,58 @@
+"""
+Streaming helpers for the photo scanner pipeline.
+
+Stages are plain generators. buffered() runs a stage in a background
+thread and hands its items to the next stage through a bounded queue,
+so stages overlap (rendering a README while the next folder is being
+OCR'd) while at most `maxsize` items wait between them.
+"""
+
+import queue
+import threading
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def buffered(iterable, maxsize=2, name="pipeline-stage"):
+    """Iterate `iterable` in a background thread, yielding its items through a bounded queue"""
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item):
+        # Give up once the consumer is gone instead of blocking on a full queue forever
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failure(e))
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        # Consumer stopped early (or failed): let the producer thread exit
+        stop.set()
+        thread.join()
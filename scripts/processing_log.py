@@ -0,0 +1,88 @@
+"""
+Incremental-scan manifest for the photo scanner.
+
+announcements/.processing-log.json remembers, per announcement folder,
+a fingerprint (size, mtime, SHA-256) of every image it was generated
+from. A folder is only re-scanned when its set of image hashes changed.
+Size and mtime are just a shortcut: an image whose size and mtime match
+the recorded ones is not re-hashed, while a fresh checkout (new mtimes)
+costs one hash per image and still no OCR.
+
+The legacy `processed_folders` list is kept up to date for older tools.
+"""
+
+from datetime import datetime, timezone
+import hashlib
+import json
+from pathlib import Path
+
+from atomic_write import write_atomic
+
+DEFAULT_PATH = Path("announcements") / ".processing-log.json"
+VERSION = 2
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ProcessingLog:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        except ValueError:
+            # A truncated or hand-edited log only costs one full rescan
+            print(f"⚠️  Ignoring unreadable processing log {self.path}; every folder will be rescanned")
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        self.folders = data.get("folders", {})
+        # Folders processed before fingerprints were recorded
+        self.legacy = set(data.get("processed_folders", [])) - set(self.folders)
+
+    def fingerprint(self, folder_name, image_files):
+        """Fingerprint each image, reusing recorded hashes when size and mtime are unchanged"""
+        known = self.folders.get(folder_name, {}).get("images", {})
+        images = {}
+        for path in image_files:
+            stat = path.stat()
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            recorded = known.get(path.name)
+            if recorded and all(recorded.get(k) == v for k, v in entry.items()):
+                entry["sha256"] = recorded["sha256"]
+            else:
+                entry["sha256"] = file_sha256(path)
+            images[path.name] = entry
+        return images
+
+    def is_current(self, folder_name, images):
+        """True when the folder was processed from exactly this set of images"""
+        recorded = self.folders.get(folder_name)
+        if recorded is None:
+            return False
+        hashes = lambda entries: {name: entry["sha256"] for name, entry in entries.items()}
+        return hashes(recorded["images"]) == hashes(images)
+
+    def record(self, folder_name, images):
+        self.folders[folder_name] = {
+            "images": images,
+            "processed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self.legacy.discard(folder_name)
+
+    def save(self):
+        """Write the manifest atomically (temp file + rename)"""
+        data = {
+            "version": VERSION,
+            "processed_folders": sorted(set(self.folders) | self.legacy),
+            "folders": {name: self.folders[name] for name in sorted(self.folders)},
+        }
+        write_atomic(self.path, json.dumps(data, indent=2, ensure_ascii=False) + "\n")
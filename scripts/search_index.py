@@ -0,0 +1,155 @@
+"""
+Full-text index over the photo scanner's OCR output.
+
+Every OCR'd image's cleaned text (untruncated, per strategy) is stored in
+an SQLite FTS5 table with the trigram tokenizer, which indexes character
+3-grams and therefore works for Chinese text without word segmentation.
+The scanner replaces a folder's rows whenever it re-processes that
+folder, so the index stays current incrementally. Folders that have no
+rows yet (e.g. after the index file was deleted, or for folders last
+scanned before it existed) are filled in from their announcement.json.
+
+Query from the command line:
+    python scripts/search_index.py 技能3 傷害
+    python scripts/search_index.py --limit 5 "武將介紹"
+
+All terms must match (in any strategy's text). Terms of three or more
+characters use the trigram index; shorter terms (common for two-character
+Chinese words) fall back to a substring scan of the candidate rows.
+"""
+
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from archive_records import SIDECAR_NAME
+
+DEFAULT_PATH = ".search-index.sqlite3"
+COLUMNS = ("orange", "bright", "standard")
+
+
+class SearchIndexError(RuntimeError):
+    """The SQLite build has no FTS5 trigram tokenizer (needs SQLite 3.34+)"""
+
+
+class SearchIndex:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        try:
+            with self._conn:
+                self._conn.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS image_text USING fts5(
+                        folder UNINDEXED, image UNINDEXED, sha256 UNINDEXED, updated_at UNINDEXED,
+                        {", ".join(COLUMNS)},
+                        tokenize = 'trigram'
+                    )
+                """)
+        except sqlite3.OperationalError as e:
+            self._conn.close()
+            raise SearchIndexError(f"SQLite {sqlite3.sqlite_version} cannot build the search index: {e}") from e
+
+    def update_folder(self, folder, images):
+        """Replace a folder's rows with `images`: an iterable of (image name, sha256, text dict)"""
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._conn:
+            self._conn.execute("DELETE FROM image_text WHERE folder = ?", (folder,))
+            self._conn.executemany(
+                f"INSERT INTO image_text (folder, image, sha256, updated_at, {', '.join(COLUMNS)}) "
+                f"VALUES (?, ?, ?, ?, {', '.join('?' for _ in COLUMNS)})",
+                [(folder, image, sha256, now, *(text_dict.get(column) or "" for column in COLUMNS))
+                 for image, sha256, text_dict in images],
+            )
+
+    def sync(self, folders):
+        """
+        Drop rows of folders that no longer exist and fill in folders without
+        rows from their sidecars. Returns the number of folders filled in.
+        """
+        names = {folder.name for folder in folders}
+        indexed = {folder for (folder,) in self._conn.execute("SELECT DISTINCT folder FROM image_text")}
+        with self._conn:
+            self._conn.executemany("DELETE FROM image_text WHERE folder = ?",
+                                   [(name,) for name in indexed - names])
+        filled = 0
+        for folder in folders:
+            if folder.name in indexed:
+                continue
+            try:
+                record = json.loads((folder / SIDECAR_NAME).read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                continue
+            images = [(image["name"], image.get("sha256"), image["ocr"])
+                      for image in record.get("images", []) if image.get("ocr")]
+            if images:
+                self.update_folder(folder.name, images)
+                filled += 1
+        return filled
+
+    def search(self, terms, limit=20):
+        """Return [{folder, image, snippet}] for images whose text contains every term"""
+        terms = [term for term in terms if term.strip()]
+        if not terms:
+            return []
+
+        long_terms = [term for term in terms if len(term) >= 3]
+        short_terms = [term for term in terms if len(term) < 3]
+        where, params = [], []
+        if long_terms:
+            where.append("image_text MATCH ?")
+            params.append(" AND ".join('"' + term.replace('"', '""') + '"' for term in long_terms))
+        for term in short_terms:
+            where.append("(" + " OR ".join(f"instr({column}, ?) > 0" for column in COLUMNS) + ")")
+            params.extend([term] * len(COLUMNS))
+
+        order = "bm25(image_text)" if long_terms else "folder, image"
+        snippet_term = terms[0]
+        rows = self._conn.execute(
+            f"SELECT folder, image, {' || char(10) || '.join(COLUMNS)} FROM image_text "
+            f"WHERE {' AND '.join(where)} ORDER BY {order} LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [{"folder": folder, "image": image, "snippet": _snippet(text, snippet_term)}
+                for folder, image, text in rows]
+
+    def close(self):
+        self._conn.close()
+
+
+def _snippet(text, term, width=30):
+    position = text.find(term)
+    if position < 0:
+        return text[:width * 2].replace("\n", " ")
+    start = max(0, position - width)
+    return ("…" if start else "") + text[start:position + len(term) + width].replace("\n", " ") + "…"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the OCR text of all scanned announcements")
+    parser.add_argument("terms", nargs="+", help="all terms must appear in an image's text")
+    parser.add_argument("--index", default=DEFAULT_PATH, help="index file written by photo_scanner.py")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.index):
+        print(f"No search index at {args.index}; run scripts/photo_scanner.py first")
+        return 2
+
+    index = SearchIndex(args.index)
+    started = time.perf_counter()
+    hits = index.search(args.terms, args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    index.close()
+
+    for hit in hits:
+        print(f"announcements/{hit['folder']}/images/{hit['image']}\n    {hit['snippet']}")
+    print(f"{len(hits)} hit(s) in {elapsed:.1f} ms")
+    return 0 if hits else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
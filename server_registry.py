@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Account / server registry shared by main.py, redemption.py and app.py.
+
+Servers and monarch IDs live in servers.json (or the file named by
+SERVERS_FILE) instead of being hard-coded in each entry point. The file
+is parsed and validated once per process: duplicate server keys,
+duplicate IDs within a server and server names the coupon site does not
+offer are rejected up front.
+"""
+
+from collections import Counter
+from functools import lru_cache
+import json
+import os
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "servers.json")
+
+
+class ServerRegistryError(ValueError):
+    """servers.json is malformed or a selection names unknown servers"""
+
+
+def _reject_duplicate_keys(pairs):
+    duplicates = sorted(key for key, count in Counter(key for key, _ in pairs).items() if count > 1)
+    if duplicates:
+        raise ServerRegistryError(f"Duplicate keys in server registry: {', '.join(duplicates)}")
+    return dict(pairs)
+
+
+class ServerRegistry:
+    def __init__(self, servers, known_server_names):
+        self.known_server_names = frozenset(known_server_names)
+        self.servers = {}
+
+        errors = []
+        for key, entry in servers.items():
+            name = entry.get("server_name")
+            ids = entry.get("ids", [])
+            if not name:
+                errors.append(f"{key}: missing server_name")
+            elif self.known_server_names and name not in self.known_server_names:
+                errors.append(f"{key}: unknown server name '{name}'")
+
+            if not all(isinstance(monarch_id, str) and monarch_id.strip() for monarch_id in ids):
+                errors.append(f"{key}: IDs must be non-empty strings")
+            duplicates = sorted(monarch_id for monarch_id, count in Counter(ids).items() if count > 1)
+            if duplicates:
+                errors.append(f"{key}: duplicate IDs {duplicates}")
+
+            server_data = {"server_name": name, "ids": list(ids)}
+            if entry.get("enabled", True):
+                self.servers[key] = server_data
+
+        if errors:
+            raise ServerRegistryError("Invalid server registry:\n  " + "\n  ".join(errors))
+
+    def __contains__(self, key):
+        return key in self.servers
+
+    def __getitem__(self, key):
+        return self.servers[key]
+
+    def unknown(self, keys):
+        """Return the keys in `keys` that are not enabled servers"""
+        return [key for key in keys if key not in self.servers]
+
+    @staticmethod
+    def parse_selection(value):
+        """Turn a comma-separated SERVERS value (or a list) into a list of keys; empty means all"""
+        if not value:
+            return None
+        if isinstance(value, str):
+            value = value.split(",")
+        keys = [key.strip() for key in value if key and key.strip()]
+        return keys or None
+
+
+@lru_cache(maxsize=None)
+def _load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f, object_pairs_hook=_reject_duplicate_keys)
+    return ServerRegistry(data.get("servers", {}), data.get("known_server_names", []))
+
+
+def load_registry(path=None):
+    """Load, validate and cache the registry at `path` (default: SERVERS_FILE or servers.json)"""
+    return _load(os.path.abspath(path or os.getenv("SERVERS_FILE", DEFAULT_PATH)))
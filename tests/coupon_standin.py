@@ -0,0 +1,103 @@
+"""
+Local stand-in for coupon.kingdom-story.com.
+
+Serves a coupon page with the same shape as the real one (the form with
+a hidden token, the server dropdown list) and answers form posts with
+the result modal (body > div[2] > div > p). Each (server, monarch, code)
+succeeds once and is "already redeemed" afterwards; codes in
+`invalid_codes` are rejected.
+"""
+
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from urllib.parse import parse_qs
+
+TOKEN = "standin-token"
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Coupon</title></head>
+<body>
+<div class="header">Kingdom Story</div>
+<main>
+<form action="/redeem" method="post">
+<input type="hidden" name="_token" value="{token}">
+<span class="js-selected-text">Select server</span>
+<ul data-type="server">{servers}</ul>
+<input type="text" name="monarch">
+<input type="text" name="serialcode">
+<button type="submit">Redeem</button>
+</form>
+</main>
+<div class="modal"><div><p>{message}</p><button>OK</button></div></div>
+</body></html>
+"""
+
+
+class CouponStandIn:
+    def __init__(self, server_names, invalid_codes=()):
+        self.servers = {name: str(value) for value, name in enumerate(server_names, 1)}
+        self.invalid_codes = set(invalid_codes)
+        self.redeemed = set()
+        # Every form post as a dict of its fields
+        self.posts = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def page(self, message=""):
+        servers = "".join(f'<li data-value="{value}">{escape(name)}</li>' for name, value in self.servers.items())
+        return _PAGE.format(token=TOKEN, servers=servers, message=escape(message))
+
+    def answer(self, fields):
+        with self._lock:
+            self.posts.append(fields)
+        if fields.get("_token") != TOKEN:
+            return 419, "Page expired, please try again later"
+        server = fields.get("server")
+        if server not in self.servers.values():
+            return 200, "Invalid server"
+        code = fields.get("serialcode", "")
+        if code in self.invalid_codes:
+            return 200, "Invalid coupon code"
+        key = (server, fields.get("monarch"), code)
+        with self._lock:
+            if key in self.redeemed:
+                return 200, "This coupon has already been used"
+            self.redeemed.add(key)
+        return 200, "兌換成功，請至信箱領取獎勵"
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._send(200, standin.page())
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                fields = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode("utf-8")).items()}
+                status, message = standin.answer(fields)
+                self._send(status, standin.page(message))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
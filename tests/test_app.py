@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+import app as service
+from jobs import JobQueue
+
+
+@pytest.fixture
+def client(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(service.job_queue, "submit", lambda *args, **kwargs: submitted.append((args, kwargs)))
+    client = service.app.test_client()
+    client.submitted = submitted
+    return client
+
+
+@pytest.mark.parametrize("body, error", [
+    ({"code": "gift", "backend": "curl"}, "Unknown backend: curl"),
+    ({"code": "gift", "servers": ["NOPE"]}, "Unknown servers: NOPE"),
+    ({}, "No gift code provided"),
+])
+def test_invalid_requests_are_rejected(client, body, error):
+    response = client.post("/redeem", json=body)
+
+    assert response.status_code == 400
+    assert error in response.get_json()["error"]
+    assert client.submitted == []
+
+
+def _events(body):
+    events = []
+    for block in body.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_job_progress_is_polled_and_streamed(monkeypatch):
+    def runner(job, on_result):
+        for monarch_id in ("a", "b"):
+            on_result({"server": job.servers[0], "monarch_id": monarch_id, "code": job.code, "result": "success"})
+
+    queue = JobQueue(runner)
+    monkeypatch.setattr(service, "job_queue", queue)
+    client = service.app.test_client()
+
+    response = client.post("/redeem", json={"code": "gift", "servers": ["US"], "backend": "http"})
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    assert response.get_json()["status_url"] == f"/jobs/{job_id}"
+    queue.executor.shutdown(wait=True)
+
+    status = client.get(f"/jobs/{job_id}?since=1").get_json()
+    assert status["status"] == "done" and status["backend"] == "http"
+    assert status["completed"] == 2
+    assert [r["monarch_id"] for r in status["results"]] == ["b"]
+
+    stream = client.get(f"/jobs/{job_id}", headers={"Accept": "text/event-stream"})
+    assert stream.mimetype == "text/event-stream"
+    events = _events(stream.get_data(as_text=True))
+    assert [name for name, _ in events] == ["result", "result", "status"]
+    assert [data["monarch_id"] for _, data in events[:2]] == ["a", "b"]
+    assert events[-1][1]["status"] == "done" and events[-1][1]["results"] == []
+
+    assert client.get("/jobs/unknown").status_code == 404
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from archive_records import SIDECAR_NAME, ArchiveIndex, write_sidecar
+from atomic_write import write_atomic
+from photo_scanner import KingdomStoryPhotoScanner
+
+
+def _record(folder, date):
+    return {"version": 1, "folder": folder, "title": folder.title(), "date": date, "images": []}
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_sync_loads_missing_sidecars_and_drops_removed_folders(tmp_path):
+    root = tmp_path / "announcements"
+    old, new, bare = root / "2025-01-old", root / "2025-02-new", root / "2025-03-bare"
+    for folder in (old, new, bare):
+        folder.mkdir(parents=True)
+    write_sidecar(old, _record(old.name, "2025-01-01"))
+    write_sidecar(new, _record(new.name, "2025-02-01"))
+    index = ArchiveIndex(root / "index.jsonl")
+    index.update(_record("2024-12-removed", "2024-12-01"))
+    index.save()
+
+    index = ArchiveIndex(root / "index.jsonl")
+    index.sync([old, new, bare])
+    index.save()
+
+    # Newest first, one compact record per line
+    assert [record["folder"] for record in _lines(root / "index.jsonl")] == [new.name, old.name]
+    assert json.loads((new / SIDECAR_NAME).read_text(encoding="utf-8")) == _lines(root / "index.jsonl")[0]
+
+
+def test_save_rewrites_only_when_changed_and_drops_corrupt_lines(tmp_path):
+    path = tmp_path / "index.jsonl"
+    good = json.dumps(_record("a", "2025-01-01"))
+    path.write_text(good + "\n{truncated\n", encoding="utf-8")
+
+    index = ArchiveIndex(path)
+    assert list(index.records) == ["a"] and index.changed
+    index.save()
+    assert path.read_text(encoding="utf-8") == json.dumps(_record("a", "2025-01-01"), separators=(",", ":")) + "\n"
+
+    mtime = path.stat().st_mtime_ns
+    reopened = ArchiveIndex(path)
+    reopened.sync([tmp_path / "a"])
+    reopened.save()
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_update_replaces_a_folder_record(tmp_path):
+    index = ArchiveIndex(tmp_path / "index.jsonl")
+    index.update(_record("a", "2025-01-01"))
+    index.update(dict(_record("a", "2025-01-01"), title="Rescanned"))
+    index.save()
+
+    assert [record["title"] for record in _lines(tmp_path / "index.jsonl")] == ["Rescanned"]
+
+
+def test_unchanged_folders_without_a_sidecar_get_a_record(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    folder = tmp_path / "announcements" / "2025-06-warrior-class-rework"
+    (folder / "images").mkdir(parents=True)
+    (folder / "images" / "01.jpg").write_bytes(b"jpeg")
+    (folder / "README.md").write_text("# Warrior Class Rework (戰士職業重做)\n\n![Main](images/01.jpg)\n",
+                                      encoding="utf-8")
+    log_path = tmp_path / "announcements" / ".processing-log.json"
+    log_path.write_text(json.dumps({"processed_folders": [folder.name]}), encoding="utf-8")
+    scanner = KingdomStoryPhotoScanner(cache_dir=None, log_path=log_path, index_path=None, derivatives=(),
+                                       archive_path=tmp_path / "announcements" / "index.jsonl")
+
+    scanner.run()
+
+    record = json.loads((folder / SIDECAR_NAME).read_text(encoding="utf-8"))
+    assert record["title"] == "Warrior Class Rework (戰士職業重做)"
+    assert record["date"] == "2025-06-01"
+    assert record["ocr_backend"] is None
+    assert [image["name"] for image in record["images"]] == ["01.jpg"]
+    assert "ocr" not in record["images"][0]
+    assert _lines(tmp_path / "announcements" / "index.jsonl") == [record]
+    # The hand-written README is left alone
+    assert (folder / "README.md").read_text(encoding="utf-8").startswith("# Warrior Class Rework")
+
+
+def test_write_atomic_replaces_and_cleans_up(tmp_path):
+    path = tmp_path / "nested" / "out.json"
+    write_atomic(path, "first")
+    write_atomic(path, b"second")
+    assert path.read_bytes() == b"second"
+
+    with pytest.raises(TypeError):
+        write_atomic(path, 42)
+    assert path.read_bytes() == b"second"
+    assert [p.name for p in path.parent.iterdir()] == ["out.json"]
@@ -0,0 +1,120 @@
+import pytest
+
+from browser_pool import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.healthy = True
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("chrome not reachable")
+        return 1
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+class Factory:
+    def __init__(self):
+        self.drivers = []
+
+    def __call__(self):
+        driver = FakeDriver(len(self.drivers))
+        self.drivers.append(driver)
+        return driver
+
+
+@pytest.fixture
+def factory():
+    return Factory()
+
+
+def _pool(factory, **kwargs):
+    kwargs.setdefault("idle_timeout", 600)
+    return BrowserPool(factory, **kwargs)
+
+
+def test_sessions_are_reused_until_max_uses(factory):
+    pool = _pool(factory, max_size=1, max_uses=2)
+
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    pool.release(first)
+
+    # Retired after its second lease
+    assert first.quit_called
+    second = pool.acquire()
+    assert second is not first and len(factory.drivers) == 2
+    pool.close()
+
+
+def test_broken_sessions_are_not_reused(factory):
+    pool = _pool(factory, max_size=1)
+
+    first = pool.acquire()
+    pool.release(first, broken=True)
+
+    assert first.quit_called
+    assert pool.acquire() is not first
+    pool.close()
+
+
+def test_unhealthy_idle_sessions_are_discarded_on_acquire(factory):
+    pool = _pool(factory, max_size=2)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    pool.release(second)
+    second.healthy = False
+
+    # The most recently released session is tried first, fails its health check and is replaced by the other
+    assert pool.acquire() is first
+    assert second.quit_called
+    assert pool.size == 1
+    pool.close()
+
+
+def test_acquire_waits_for_capacity(factory):
+    pool = _pool(factory, max_size=1)
+    pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+
+    pool.ensure_capacity(2)
+    assert pool.acquire(timeout=0.05) is factory.drivers[1]
+    pool.close()
+
+
+def test_evict_idle_keeps_min_size(factory):
+    pool = _pool(factory, max_size=3, min_size=1)
+    drivers = [pool.acquire() for _ in range(3)]
+    for driver in drivers:
+        pool.release(driver)
+    for session in pool._idle:
+        session.last_used -= 1000
+
+    assert pool.evict_idle() == 2
+    assert pool.size == 1
+    assert sum(driver.quit_called for driver in drivers) == 2
+    # Nothing left to evict below min_size
+    assert pool.evict_idle() == 0
+    pool.close()
+
+
+def test_evict_idle_leaves_recent_sessions(factory):
+    pool = _pool(factory, max_size=2, min_size=0)
+    driver = pool.acquire()
+    pool.release(driver)
+
+    assert pool.evict_idle() == 0
+    assert not driver.quit_called
+    pool.close()
+    assert driver.quit_called
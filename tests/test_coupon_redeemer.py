@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+import coupon_redeemer
+from coupon_redeemer import CouponRedemption
+from outcomes import ResultType
+from server_registry import ServerRegistryError
+
+
+class FlakyDriver:
+    """A browser whose coupon page never loads"""
+
+    def __init__(self):
+        self.loads = 0
+
+    def get(self, url):
+        self.loads += 1
+        raise TimeoutError("page load timed out")
+
+
+class FakePool:
+    def __init__(self):
+        self.driver = FlakyDriver()
+        self.released = []
+
+    def acquire(self, timeout=None):
+        return self.driver
+
+    def release(self, driver, broken=False):
+        self.released.append(broken)
+
+
+class FakeLedger:
+    def __init__(self):
+        self.records = []
+
+    def pending(self, work):
+        return list(work)
+
+    def record(self, code, server, monarch_id, message, status, attempts=1):
+        self.records.append((code, server, monarch_id, status, attempts))
+
+
+def test_page_that_never_loads_reports_every_item_as_transient(monkeypatch):
+    monkeypatch.setattr(coupon_redeemer, "RETRY_BASE_DELAY", 0)
+    pool = FakePool()
+    redeemer_cls = type("Redeemer", (CouponRedemption,), {"browser_pool": pool})
+    ledger = FakeLedger()
+    work = [("US", "alice", "gift"), ("US", "bob", "gift")]
+
+    reported = []
+    results = redeemer_cls("gift", backend="selenium", ledger=ledger).run_work_list(work, on_result=reported.append)
+
+    assert pool.driver.loads == coupon_redeemer.MAX_ATTEMPTS
+    assert [(r["monarch_id"], r["result"], r["attempts"]) for r in results] == [
+        ("alice", ResultType.TRANSIENT, 0), ("bob", ResultType.TRANSIENT, 0)]
+    assert reported == results
+    assert [record[2:4] for record in ledger.records] == [("alice", ResultType.TRANSIENT), ("bob", ResultType.TRANSIENT)]
+    assert pool.released == [True]
+
+
+def test_parallel_run_grows_the_pool_to_the_worker_count(monkeypatch):
+    from browser_pool import BrowserPool
+
+    pool = BrowserPool(lambda: None, max_size=1, idle_timeout=None)
+    redeemer_cls = type("Redeemer", (CouponRedemption,), {"browser_pool": pool})
+    monkeypatch.setattr(redeemer_cls, "run_work_list", lambda self, shard: [])
+
+    redeemer_cls.run_parallel("gift", servers=["US"], max_workers=3, backend="http")
+
+    assert pool.max_size == 3
+
+
+def test_unknown_servers_are_rejected():
+    with pytest.raises(ServerRegistryError, match="NOPE"):
+        CouponRedemption.build_work_list(["gift"], servers=["US", "NOPE"])
+
+
+def test_work_list_follows_the_current_servers_file(tmp_path, monkeypatch):
+    servers_file = tmp_path / "servers.json"
+    servers_file.write_text(json.dumps({
+        "known_server_names": ["Imperial Conquest"],
+        "servers": {"TEST": {"server_name": "Imperial Conquest", "ids": ["a", "b"]}},
+    }), encoding="utf-8")
+    monkeypatch.setenv("SERVERS_FILE", str(servers_file))
+
+    assert CouponRedemption.build_work_list(["gift"]) == [("TEST", "a", "gift"), ("TEST", "b", "gift")]
+    with pytest.raises(ServerRegistryError, match="US"):
+        CouponRedemption.build_work_list(["gift"], servers=["US"])
@@ -0,0 +1,89 @@
+import cv2
+import numpy as np
+import pytest
+
+from derivatives import DISPLAY_VARIANT, DerivativeWriter, derived_path
+from photo_scanner import KingdomStoryPhotoScanner
+from processing_log import file_sha256
+
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / "2025-06-warrior-class-rework"
+    (folder / "images").mkdir(parents=True)
+    for seed, name in enumerate(("01.jpg", "02.jpg")):
+        _write_image(folder / "images" / name, seed)
+    return folder
+
+
+def _write_image(path, seed, width=1600):
+    blocks = np.random.default_rng(seed).integers(0, 256, size=(8, 8, 3), dtype=np.uint8)
+    cv2.imwrite(str(path), cv2.resize(blocks, (width, width), interpolation=cv2.INTER_NEAREST))
+
+
+def _images(folder):
+    return sorted((folder / "images").glob("*.jpg"))
+
+
+def _hashes(folder):
+    return {path.name: file_sha256(path) for path in _images(folder)}
+
+
+def test_builds_variants_and_skips_current_ones(folder):
+    writer = DerivativeWriter(("webp", "thumb"))
+    if not writer.variants:
+        pytest.skip("OpenCV cannot write WebP")
+
+    built, before, after = writer.update_folder(_images(folder), _hashes(folder))
+    assert built == 2 and 0 < after < before
+    display = derived_path(_images(folder)[0], DISPLAY_VARIANT)
+    assert cv2.imread(str(display)).shape[1] == 1080
+    assert cv2.imread(str(derived_path(_images(folder)[0], "thumb"))).shape[1] == 320
+
+    mtime = display.stat().st_mtime_ns
+    assert writer.update_folder(_images(folder), _hashes(folder)) == (0, 0, 0)
+    assert display.stat().st_mtime_ns == mtime
+
+
+def test_rebuilds_changed_and_missing_variants_and_drops_removed_ones(folder):
+    writer = DerivativeWriter(("webp", "thumb"))
+    if not writer.variants:
+        pytest.skip("OpenCV cannot write WebP")
+    writer.update_folder(_images(folder), _hashes(folder))
+    first, second = _images(folder)
+
+    _write_image(first, seed=7)
+    assert writer.update_folder(_images(folder), _hashes(folder))[0] == 1
+
+    derived_path(second, "thumb").unlink()
+    assert writer.update_folder(_images(folder), _hashes(folder))[0] == 1
+    assert derived_path(second, "thumb").exists()
+
+    second.unlink()
+    assert writer.update_folder(_images(folder), _hashes(folder))[0] == 0
+    assert not derived_path(second, DISPLAY_VARIANT).exists()
+    assert not derived_path(second, "thumb").exists()
+
+
+def test_refresh_embeds_new_display_copies_in_the_readme(folder, tmp_path):
+    scanner = KingdomStoryPhotoScanner(cache_dir=None, log_path=tmp_path / "log.json", index_path=None,
+                                       archive_path=None, derivatives=("webp",))
+    if scanner.derivative_writer is None or not scanner.derivative_writer.variants:
+        pytest.skip("OpenCV cannot write WebP")
+    readme = folder / "README.md"
+    readme.write_text("# Warrior Class Rework\n\n"
+                      "![Main Announcement](images/01.jpg)\n"
+                      "[![02](images/derived/02.webp)](images/02.jpg)\n"
+                      "![Missing](images/03.jpg)\n", encoding="utf-8")
+    fingerprint = {name: {"sha256": sha256} for name, sha256 in _hashes(folder).items()}
+
+    scanner.refresh_derivatives(folder, _images(folder), fingerprint)
+
+    assert readme.read_text(encoding="utf-8") == (
+        "# Warrior Class Rework\n\n"
+        "[![Main Announcement](images/derived/01.webp)](images/01.jpg)\n"
+        "[![02](images/derived/02.webp)](images/02.jpg)\n"
+        "![Missing](images/03.jpg)\n")
+    mtime = readme.stat().st_mtime_ns
+    scanner.refresh_derivatives(folder, _images(folder), fingerprint)
+    assert readme.stat().st_mtime_ns == mtime
@@ -0,0 +1,47 @@
+import pytest
+
+import coupon_redeemer
+import main
+from coupon_standin import TOKEN, CouponStandIn
+from outcomes import ResultType
+from server_registry import load_registry
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    with CouponStandIn(sorted(load_registry().known_server_names), invalid_codes={"expired"}) as standin:
+        monkeypatch.setattr(coupon_redeemer, "COUPON_URL", standin.url)
+        yield standin
+
+
+def _ids(*servers):
+    registry = load_registry()
+    return [(server, monarch_id) for server in servers for monarch_id in registry[server]["ids"]]
+
+
+def test_parallel_http_redemption(standin):
+    results = main.run_parallel_redemption(["gift", "expired"], servers=["US", "KOR"], max_workers=2,
+                                           backend="http")
+
+    expected = [(server, monarch_id, code) for server, monarch_id in _ids("US", "KOR")
+                for code in ("gift", "expired")]
+    assert [(r["server"], r["monarch_id"], r["code"]) for r in results] == expected
+    assert {r["code"]: r["result"] for r in results} == {
+        "gift": ResultType.SUCCESS,
+        "expired": ResultType.INVALID_CODE,
+    }
+    assert all(r["attempts"] == 1 for r in results)
+
+    # The replayed form carries the page's hidden fields and the dropdown value for the server name
+    assert len(standin.posts) == len(expected)
+    assert all(post["_token"] == TOKEN for post in standin.posts)
+    assert {post["server"] for post in standin.posts} == {
+        standin.servers[load_registry()[server]["server_name"]] for server in ("US", "KOR")
+    }
+
+
+def test_second_run_reports_already_redeemed(standin):
+    main.run_parallel_redemption("gift", servers=["11"], max_workers=2, backend="http")
+    results = main.run_parallel_redemption("gift", servers=["11"], max_workers=2, backend="http")
+
+    assert [r["result"] for r in results] == [ResultType.ALREADY_REDEEMED] * len(_ids("11"))
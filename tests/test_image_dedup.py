@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+import pytest
+
+from image_dedup import DEFAULT_THRESHOLD, DuplicateIndex, hamming, perceptual_hashes
+from photo_scanner import FolderPlan, KingdomStoryPhotoScanner
+from processing_log import file_sha256
+
+
+def _page(seed, width=600, height=800):
+    """A synthetic announcement page: sharp-edged random panels, like a banner plus text boxes"""
+    blocks = np.random.default_rng(seed).integers(0, 256, size=(height // 100, width // 100, 3), dtype=np.uint8)
+    return cv2.resize(blocks, (width, height), interpolation=cv2.INTER_NEAREST)
+
+
+def _write(path, image, quality=95):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return path
+
+
+def _match(index, path):
+    return index.match(path, file_sha256(path), perceptual_hashes(path))
+
+
+def test_exact_copy_matches_by_content_hash(tmp_path):
+    original = _write(tmp_path / "a.jpg", _page(1))
+    copy = tmp_path / "b.jpg"
+    copy.write_bytes(original.read_bytes())
+    index = DuplicateIndex(threshold=-1)
+
+    assert _match(index, original) is None
+    assert _match(index, copy) == original
+
+
+def test_reencoded_and_resized_copies_are_near_duplicates(tmp_path):
+    page = _page(2)
+    original = _write(tmp_path / "a.jpg", page)
+    reencoded = _write(tmp_path / "b.jpg", page, quality=60)
+    resized = _write(tmp_path / "c.jpg", cv2.resize(page, (480, 640), interpolation=cv2.INTER_AREA), quality=75)
+    index = DuplicateIndex()
+
+    assert _match(index, original) is None
+    assert _match(index, reencoded) == original
+    assert _match(index, resized) == original
+
+
+def test_different_pages_are_kept_apart(tmp_path):
+    index = DuplicateIndex()
+
+    assert _match(index, _write(tmp_path / "a.jpg", _page(3))) is None
+    assert _match(index, _write(tmp_path / "b.jpg", _page(4))) is None
+
+
+def test_same_content_at_another_aspect_ratio_is_not_a_duplicate(tmp_path):
+    page = _page(5)
+    original = _write(tmp_path / "a.jpg", page)
+    stretched = _write(tmp_path / "b.jpg", cv2.resize(page, (900, 800), interpolation=cv2.INTER_AREA))
+    index = DuplicateIndex()
+
+    assert _match(index, original) is None
+    # The thumbnails are alike, only the aspect check keeps them apart
+    _, ahash, dhash = perceptual_hashes(original)
+    _, other_ahash, other_dhash = perceptual_hashes(stretched)
+    assert hamming(ahash, other_ahash) <= DEFAULT_THRESHOLD and hamming(dhash, other_dhash) <= DEFAULT_THRESHOLD
+    assert _match(index, stretched) is None
+
+
+@pytest.mark.parametrize("bits, matches", [(DEFAULT_THRESHOLD, True), (DEFAULT_THRESHOLD + 1, False)])
+def test_threshold_is_inclusive(bits, matches):
+    index = DuplicateIndex()
+    index.match("a", "sha-a", (1.0, 0, 0))
+
+    assert DEFAULT_THRESHOLD == 12
+    assert (index.match("b", "sha-b", (1.0, (1 << bits) - 1, 0)) == "a") is matches
+
+
+def test_find_does_not_index(tmp_path):
+    index = DuplicateIndex()
+
+    assert index.find("sha-a", (1.0, 0, 0)) is None
+    assert index.find("sha-a", (1.0, 0, 0)) is None
+    assert index.match("a", "sha-a", (1.0, 0, 0)) is None
+    assert index.find("sha-a", None) == "a"
+
+
+def test_root_level_copies_are_reported_as_stray(tmp_path):
+    folder = tmp_path / "2025-09-22-sun-shang-xiang"
+    images = [_write(folder / "images" / name, _page(seed)) for seed, name in enumerate(("01.jpg", "02.jpg"))]
+    (folder / "01.jpg").write_bytes(images[0].read_bytes())
+    _write(folder / "cover.jpg", _page(9))
+    scanner = KingdomStoryPhotoScanner(cache_dir=None, log_path=tmp_path / "log.json", index_path=None,
+                                       archive_path=None, derivatives=())
+    plan = FolderPlan(folder, images, {path.name: {"sha256": file_sha256(path)} for path in images})
+
+    [plan] = scanner.dedupe([plan])
+
+    assert plan.duplicates == {}
+    assert plan.stray_copies == {folder / "01.jpg": images[0]}
+    record = scanner.folder_record(plan, [], {"title": "t", "date": "2025-09-22", "character_name": None})
+    assert record["stray_copies"] == [{"name": "01.jpg", "duplicate_of": "images/01.jpg"}]
@@ -0,0 +1,61 @@
+import threading
+
+from jobs import JobQueue
+
+
+class SteppedRunner:
+    """Reports one result per step and only moves on when the test releases it"""
+
+    def __init__(self, results, error=None):
+        self.results = results
+        self.error = error
+        self.steps = [threading.Event() for _ in results]
+
+    def __call__(self, job, on_result):
+        for step, result in zip(self.steps, self.results):
+            assert step.wait(5)
+            on_result(dict(result, code=job.code))
+        if self.error:
+            raise self.error
+
+
+def _wait_status(queue, job, status):
+    with queue.changed:
+        assert queue.changed.wait_for(lambda: job.status == status, timeout=5)
+
+
+def test_job_runs_through_its_states_and_reports_results_incrementally():
+    runner = SteppedRunner([{"monarch_id": "a"}, {"monarch_id": "b"}])
+    queue = JobQueue(runner, max_workers=1)
+    job = queue.submit("gift", servers=["US"])
+    # The single worker is busy, so a second job waits its turn
+    waiting = queue.submit("other")
+
+    _wait_status(queue, job, "running")
+    assert queue.snapshot(waiting)["status"] == "queued"
+
+    runner.steps[0].set()
+    first = queue.wait(job, 0)
+    assert [r["monarch_id"] for r in first["results"]] == ["a"] and first["completed"] == 1
+
+    runner.steps[1].set()
+    _wait_status(queue, job, "done")
+    snapshot = queue.snapshot(job, since=1)
+    assert [r["monarch_id"] for r in snapshot["results"]] == ["b"]
+    assert snapshot["completed"] == 2
+    assert snapshot["started_at"] and snapshot["finished_at"] and snapshot["error"] is None
+    queue.executor.shutdown(wait=True)
+    assert queue.get(waiting.id).status == "done"
+
+
+def test_failed_job_keeps_its_results_and_error():
+    runner = SteppedRunner([{"monarch_id": "a"}], error=RuntimeError("Chrome crashed"))
+    queue = JobQueue(runner)
+    job = queue.submit("gift")
+    runner.steps[0].set()
+
+    _wait_status(queue, job, "failed")
+    snapshot = queue.snapshot(job)
+    assert snapshot["error"] == "Chrome crashed"
+    assert [r["monarch_id"] for r in snapshot["results"]] == ["a"]
+
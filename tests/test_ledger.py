@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+from ledger import RedemptionLedger
+from outcomes import TERMINAL, ResultType
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "ledger.sqlite3")
+
+
+def _rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT code, server, monarch_id, status, message, attempts FROM redemptions").fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("status", sorted(TERMINAL))
+def test_terminal_outcomes_are_not_pending(path, status):
+    ledger = RedemptionLedger(path)
+    ledger.record("gift", "US", "a", "message", status)
+
+    assert ledger.pending([("US", "a", "gift"), ("US", "b", "gift")]) == [("US", "b", "gift")]
+    ledger.close()
+
+
+@pytest.mark.parametrize("status", [ResultType.TRANSIENT, ResultType.UNKNOWN])
+def test_retryable_outcomes_stay_pending(path, status):
+    ledger = RedemptionLedger(path)
+    ledger.record("gift", "US", "a", None, status)
+
+    assert ledger.pending([("US", "a", "gift")]) == [("US", "a", "gift")]
+    ledger.close()
+
+
+def test_outcomes_are_per_code_and_server(path):
+    ledger = RedemptionLedger(path)
+    ledger.record("gift", "US", "a", "ok", ResultType.SUCCESS)
+    work = [("US", "a", "gift"), ("US", "a", "other"), ("KOR", "a", "gift")]
+
+    assert ledger.pending(work) == [("US", "a", "other"), ("KOR", "a", "gift")]
+    ledger.close()
+
+
+def test_recording_again_updates_the_one_row(path):
+    ledger = RedemptionLedger(path)
+    ledger.record("gift", "US", "a", None, ResultType.TRANSIENT, attempts=3)
+    ledger.record("gift", "US", "a", "ok", ResultType.SUCCESS)
+    ledger.record("gift", "US", "a", "ok", ResultType.SUCCESS)
+    ledger.close()
+
+    assert _rows(path) == [("gift", "US", "a", ResultType.SUCCESS, "ok", 5)]
+
+
+def test_outcomes_survive_reopening(path):
+    ledger = RedemptionLedger(path)
+    ledger.record("gift", "US", "a", "ok", ResultType.SUCCESS)
+    ledger.record("gift", "US", "b", None, ResultType.TRANSIENT)
+    ledger.close()
+
+    reopened = RedemptionLedger(path)
+    assert reopened.pending([("US", "a", "gift"), ("US", "b", "gift")]) == [("US", "b", "gift")]
+    assert reopened.settled("gift") == {("US", "a")}
+    reopened.close()
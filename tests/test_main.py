@@ -0,0 +1,41 @@
+import pytest
+
+import main
+
+
+@pytest.fixture
+def environment(monkeypatch, tmp_path):
+    monkeypatch.setattr(main.sys, "argv", ["main.py", "gift"])
+    monkeypatch.setenv("REDEMPTION_LEDGER", str(tmp_path / "ledger.sqlite3"))
+    monkeypatch.delenv("SERVERS", raising=False)
+    closed = []
+    monkeypatch.setattr(main.BROWSER_POOL, "close", lambda: closed.append(True))
+    return closed
+
+
+def test_redemption_errors_propagate_after_cleanup(environment, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("coupon site unreachable")
+    monkeypatch.setattr(main, "run_parallel_redemption", fail)
+
+    with pytest.raises(RuntimeError, match="coupon site unreachable"):
+        main.main()
+    assert environment == [True]
+
+
+def test_results_are_reported(environment, monkeypatch):
+    reported = []
+    monkeypatch.setattr(main, "run_parallel_redemption", lambda *args, **kwargs: ["result"])
+    monkeypatch.setattr(main, "log_report", reported.append)
+
+    main.main()
+
+    assert reported == [["result"]] and environment == [True]
+
+
+def test_unknown_servers_exit_before_redeeming(environment, monkeypatch):
+    monkeypatch.setenv("SERVERS", "US,NOPE")
+    monkeypatch.setattr(main, "run_parallel_redemption", lambda *args, **kwargs: pytest.fail("redeemed"))
+
+    with pytest.raises(SystemExit, match="NOPE"):
+        main.main()
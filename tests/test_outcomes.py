@@ -0,0 +1,56 @@
+import pytest
+
+from outcomes import TERMINAL, ResultType, classify
+
+# Messages as the coupon site's confirmation modal shows them
+MESSAGES = [
+    ("兌換成功，請至遊戲信箱領取獎勵。", ResultType.SUCCESS),
+    ("兑换成功，请至邮件领取奖励", ResultType.SUCCESS),
+    ("Redeemed successfully! Please check your in-game mailbox.", ResultType.SUCCESS),
+    ("쿠폰 사용에 성공했습니다. 우편함을 확인해주세요.", ResultType.SUCCESS),
+    ("クーポンの受け取りに成功しました。", ResultType.SUCCESS),
+    ("此兌換碼已使用", ResultType.ALREADY_REDEEMED),
+    ("This coupon has already been used.", ResultType.ALREADY_REDEEMED),
+    ("이미 사용된 쿠폰입니다.", ResultType.ALREADY_REDEEMED),
+    ("兌換碼不存在", ResultType.INVALID_CODE),
+    ("The coupon code is invalid or expired.", ResultType.INVALID_CODE),
+    ("角色不存在，請確認君主名稱", ResultType.INVALID_ID),
+    ("Monarch ID does not exist.", ResultType.INVALID_ID),
+    ("系統繁忙，請稍後再試", ResultType.TRANSIENT),
+    ("Server is busy, please try again later.", ResultType.TRANSIENT),
+    ("", ResultType.TRANSIENT),
+    # Retry requests that also contain a rejection word stay retryable
+    ("系統錯誤，請稍後再試", ResultType.TRANSIENT),
+    ("网络错误，请稍后再试", ResultType.TRANSIENT),
+    ("伺服器錯誤，請稍後重試", ResultType.TRANSIENT),
+    ("Invalid request, please try again later", ResultType.TRANSIENT),
+    ("Too many attempts, you have already tried 5 times. Please try again later.", ResultType.TRANSIENT),
+    # A success that mentions a delay is still a success
+    ("Redeemed successfully! Rewards will arrive in your mailbox later.", ResultType.SUCCESS),
+    ("兌換成功，獎勵稍後發送至信箱", ResultType.SUCCESS),
+    ("兌換碼錯誤", ResultType.INVALID_CODE),
+    ("Coupon has expired.", ResultType.INVALID_CODE),
+    # Failures without a known reason must not count as success (SUCCESS is never resubmitted)
+    ("This coupon cannot be redeemed.", ResultType.UNKNOWN),
+    ("Please complete all fields", ResultType.UNKNOWN),
+    ("兌換失敗", ResultType.UNKNOWN),
+    ("兌換未成功，請聯繫客服", ResultType.UNKNOWN),
+    ("無法兌換此序號", ResultType.UNKNOWN),
+    ("쿠폰 등록에 실패했습니다.", ResultType.UNKNOWN),
+    ("Redemption failed. Rewards were not sent to your mailbox.", ResultType.UNKNOWN),
+]
+
+
+@pytest.mark.parametrize("message, expected", MESSAGES)
+def test_classify_message(message, expected):
+    assert classify(message) == expected
+
+
+@pytest.mark.parametrize("message", [m for m, expected in MESSAGES if expected == ResultType.UNKNOWN])
+def test_ambiguous_messages_are_not_terminal(message):
+    assert classify(message) not in TERMINAL
+
+
+def test_classify_errors():
+    assert classify(error=TimeoutError("page load")) == ResultType.TRANSIENT
+    assert classify(error=ValueError("bad form")) == ResultType.UNKNOWN
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+
+import photo_scanner
+from photo_scanner import KingdomStoryPhotoScanner
+
+
+@pytest.fixture
+def scanner(tmp_path):
+    return KingdomStoryPhotoScanner(cache_dir=None, log_path=tmp_path / "log.json", index_path=None,
+                                    archive_path=None, derivatives=(), ocr_budget=3)
+
+
+@pytest.fixture
+def scores(monkeypatch):
+    scores = {}
+    monkeypatch.setattr(photo_scanner, "text_score", lambda path: scores[path.name])
+    return scores
+
+
+def _images(*names):
+    return [Path("announcements/2025-01-01-x/images") / name for name in names]
+
+
+def test_select_keeps_the_first_image_and_fills_the_budget_by_text_density(scanner, scores):
+    # The banner (01) has little text; 04 and 05 are the densest of the rest
+    scores.update({"01.jpg": 0.005, "02.jpg": 0.05, "03.jpg": 0.01, "04.jpg": 0.2, "05.jpg": 0.1})
+    images = _images(*sorted(scores))
+
+    selected, _ = scanner.select_images(images)
+
+    assert [path.name for path in selected] == ["01.jpg", "04.jpg", "05.jpg"]
+
+
+def test_select_skips_same_folder_copies_and_images_without_text(scanner, scores):
+    scores.update({"01.jpg": 0.0, "02.jpg": 0.3, "03.jpg": 0.3, "04.jpg": 0.001})
+    images = _images(*sorted(scores))
+
+    selected, _ = scanner.select_images(images, duplicates={images[2]: images[1]})
+
+    assert [path.name for path in selected] == ["01.jpg", "02.jpg"]
+
+
+def test_title_comes_from_the_first_ocr_result_with_a_name(scanner, tmp_path):
+    folder = tmp_path / "2025-09-22-sun-shang-xiang"
+    (folder / "images").mkdir(parents=True)
+    images = [folder / "images" / name for name in ("01.jpg", "02.jpg")]
+    text_dicts = [
+        {"orange": "2025 update", "bright": "", "standard": "Patch notes", "full": "2025 update Patch notes"},
+        {"orange": "新武將：孫尚香", "bright": "", "standard": "", "full": "新武將：孫尚香"},
+    ]
+
+    assert scanner.write_folder(folder, images, text_dicts)
+
+    assert scanner.new_entries[-1]["character_name"] == "孫尚香"
+    assert (folder / "README.md").read_text(encoding="utf-8").startswith(
+        "# 新武將介紹 - 孫尚香 (Sun Shang Xiang)\n")
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import buffered
+
+
+def test_items_arrive_in_order():
+    assert list(buffered(iter(range(50)), maxsize=3)) == list(range(50))
+
+
+def test_stage_exception_reaches_the_consumer():
+    error = ValueError("OCR failed")
+
+    def stage():
+        yield 1
+        yield 2
+        raise error
+
+    received = []
+    with pytest.raises(ValueError) as raised:
+        for item in buffered(stage(), maxsize=2):
+            received.append(item)
+
+    assert raised.value is error
+    assert received == [1, 2]
+
+
+def test_producer_stays_within_the_buffer_bound():
+    produced = []
+    lock = threading.Lock()
+
+    def stage():
+        for i in range(20):
+            with lock:
+                produced.append(i)
+            yield i
+
+    lead = 0
+    for consumed, _ in enumerate(buffered(stage(), maxsize=2), start=1):
+        # Give the producer every chance to run ahead
+        time.sleep(0.02)
+        with lock:
+            lead = max(lead, len(produced) - consumed)
+
+    # At most `maxsize` items wait in the queue, plus one the producer holds while blocked on put()
+    assert 2 <= lead <= 3
+
+
+def test_consumer_stopping_early_stops_the_producer():
+    produced = []
+
+    def stage():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    items = buffered(stage(), maxsize=2, name="test-stage")
+    assert next(items) == 0
+    items.close()
+
+    assert not any(thread.name == "test-stage" for thread in threading.enumerate())
+    assert len(produced) <= 4
@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+import processing_log
+from processing_log import ProcessingLog
+
+
+@pytest.fixture
+def folder(tmp_path):
+    images = tmp_path / "announcements" / "2025-01-01-x" / "images"
+    images.mkdir(parents=True)
+    for name in ("01.jpg", "02.jpg"):
+        (images / name).write_bytes(name.encode() * 100)
+    return images.parent
+
+
+def _images(folder):
+    return sorted((folder / "images").glob("*.jpg"))
+
+
+def _processed(path, folder):
+    """A log at `path` that recorded `folder` and was saved and reopened"""
+    log = ProcessingLog(path)
+    log.record(folder.name, log.fingerprint(folder.name, _images(folder)))
+    log.save()
+    return ProcessingLog(path)
+
+
+def test_unchanged_folder_is_current_without_rehashing(tmp_path, folder, monkeypatch):
+    log = _processed(tmp_path / "log.json", folder)
+    monkeypatch.setattr(processing_log, "file_sha256", lambda path: pytest.fail(f"re-hashed {path}"))
+
+    assert log.is_current(folder.name, log.fingerprint(folder.name, _images(folder)))
+
+
+def test_touched_image_is_rehashed_but_unchanged_content_stays_current(tmp_path, folder, monkeypatch):
+    log = _processed(tmp_path / "log.json", folder)
+    image = _images(folder)[0]
+    os.utime(image, ns=(image.stat().st_atime_ns, image.stat().st_mtime_ns + 10**9))
+    hashed = []
+    monkeypatch.setattr(processing_log, "file_sha256",
+                        lambda path, real=processing_log.file_sha256: hashed.append(path.name) or real(path))
+
+    assert log.is_current(folder.name, log.fingerprint(folder.name, _images(folder)))
+    assert hashed == ["01.jpg"]
+
+
+def test_edited_image_triggers_reprocessing(tmp_path, folder):
+    log = _processed(tmp_path / "log.json", folder)
+    image = _images(folder)[0]
+    stat = image.stat()
+    # Same size, new bytes: only the changed mtime gives it away
+    image.write_bytes(b"x" * stat.st_size)
+    os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert not log.is_current(folder.name, log.fingerprint(folder.name, _images(folder)))
+
+
+@pytest.mark.parametrize("change", ["replace", "add", "remove"])
+def test_changed_image_set_triggers_reprocessing(tmp_path, folder, change):
+    log = _processed(tmp_path / "log.json", folder)
+    if change == "replace":
+        (folder / "images" / "02.jpg").unlink()
+        (folder / "images" / "02.jpg").write_bytes(b"another image")
+    elif change == "add":
+        (folder / "images" / "03.jpg").write_bytes(b"a new image")
+    else:
+        (folder / "images" / "02.jpg").unlink()
+
+    assert not log.is_current(folder.name, log.fingerprint(folder.name, _images(folder)))
+
+
+def test_missing_log_rescans_everything(tmp_path, folder):
+    log = ProcessingLog(tmp_path / "missing.json")
+
+    assert log.folders == {} and log.legacy == set()
+    assert not log.is_current(folder.name, log.fingerprint(folder.name, _images(folder)))
+
+
+@pytest.mark.parametrize("content", ['{"folders": {"2025-01', "[]", ""])
+def test_corrupt_log_rescans_everything(tmp_path, folder, content):
+    path = tmp_path / "log.json"
+    path.write_text(content, encoding="utf-8")
+
+    log = ProcessingLog(path)
+
+    assert not log.is_current(folder.name, log.fingerprint(folder.name, _images(folder)))
+    log.record(folder.name, log.fingerprint(folder.name, _images(folder)))
+    log.save()
+    assert ProcessingLog(path).is_current(folder.name, log.fingerprint(folder.name, _images(folder)))
+
+
+def test_legacy_folders_are_kept_until_recorded(tmp_path, folder):
+    path = tmp_path / "log.json"
+    path.write_text('{"processed_folders": ["%s", "old"]}' % folder.name, encoding="utf-8")
+
+    log = ProcessingLog(path)
+    assert log.legacy == {folder.name, "old"}
+    log.record(folder.name, log.fingerprint(folder.name, _images(folder)))
+    log.save()
+
+    reopened = ProcessingLog(path)
+    assert reopened.legacy == {"old"}
+    assert set(reopened.folders) == {folder.name}
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from archive_records import SIDECAR_NAME
+from search_index import SearchIndex, SearchIndexError
+
+
+@pytest.fixture
+def index(tmp_path):
+    try:
+        index = SearchIndex(str(tmp_path / "index.sqlite3"))
+    except SearchIndexError as e:
+        pytest.skip(str(e))
+    yield index
+    index.close()
+
+
+def _text(standard, orange=""):
+    return {"orange": orange, "bright": "", "standard": standard}
+
+
+def _folders(hits):
+    return sorted({hit["folder"] for hit in hits})
+
+
+def test_trigram_terms_use_the_index(index):
+    index.update_folder("a", [("01.jpg", "s1", _text("孫尚香 技能3 造成傷害", orange="新武將 孫尚香"))])
+    index.update_folder("b", [("01.jpg", "s2", _text("董卓 技能1 提升攻擊力"))])
+
+    assert _folders(index.search(["孫尚香"])) == ["a"]
+    assert _folders(index.search(["技能3", "孫尚香"])) == ["a"]
+    assert index.search(["孫尚香", "董卓"]) == []
+
+
+def test_short_terms_fall_back_to_a_substring_scan(index):
+    # Two-character terms are below the trigram size and cannot use the FTS index
+    index.update_folder("a", [("01.jpg", "s1", _text("孫尚香 技能3 造成傷害"))])
+    index.update_folder("b", [("01.jpg", "s2", _text("董卓 技能1 提升攻擊力"))])
+
+    assert _folders(index.search(["傷害"])) == ["a"]
+    assert _folders(index.search(["技能"])) == ["a", "b"]
+    assert _folders(index.search(["技能", "攻擊力"])) == ["b"]
+    assert index.search(["傷害", "董卓"]) == []
+
+
+def test_snippet_shows_the_first_term(index):
+    index.update_folder("a", [("01.jpg", "s1", _text("前言 " * 20 + "孫尚香登場" + " 後記" * 20))])
+
+    [hit] = index.search(["孫尚香"])
+    assert hit["image"] == "01.jpg"
+    assert "孫尚香登場" in hit["snippet"] and hit["snippet"].startswith("…")
+
+
+def test_update_folder_replaces_its_rows(index):
+    index.update_folder("a", [("01.jpg", "s1", _text("舊的公告內容"))])
+    index.update_folder("a", [("02.jpg", "s2", _text("新的公告內容"))])
+
+    assert index.search(["舊的公告"]) == []
+    assert [hit["image"] for hit in index.search(["公告內容"])] == ["02.jpg"]
+
+
+def _sidecar(folder, images):
+    folder.mkdir(parents=True)
+    (folder / SIDECAR_NAME).write_text(json.dumps({"folder": folder.name, "images": images}, ensure_ascii=False),
+                                       encoding="utf-8")
+    return folder
+
+
+def test_sync_backfills_from_sidecars_and_drops_removed_folders(index, tmp_path):
+    root = tmp_path / "announcements"
+    scanned = _sidecar(root / "scanned", [
+        {"name": "01.jpg", "sha256": "s1", "ocr": _text("孫尚香 技能3")},
+        {"name": "02.jpg", "sha256": "s2"},
+    ])
+    legacy = _sidecar(root / "legacy", [{"name": "01.jpg", "sha256": "s3"}])
+    no_sidecar = root / "no-sidecar"
+    no_sidecar.mkdir()
+    index.update_folder("removed", [("01.jpg", "s4", _text("孫尚香 舊資料"))])
+    index.update_folder("kept", [("01.jpg", "s5", _text("孫尚香 已索引"))])
+    kept = root / "kept"
+    kept.mkdir()
+
+    assert index.sync([scanned, legacy, no_sidecar, kept]) == 1
+
+    assert _folders(index.search(["孫尚香"])) == ["kept", "scanned"]
+    # A second sync finds nothing to fill in
+    assert index.sync([scanned, legacy, no_sidecar, kept]) == 0